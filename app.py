@@ -1,26 +1,1127 @@
-from flask import Flask, render_template, request, jsonify, url_for
+from flask import Flask, render_template, request, jsonify, url_for, Response, stream_with_context, g
+import functools
 import hashlib
+import hmac
+import os
+import threading
+import time
+
+from werkzeug.exceptions import ClientDisconnected
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+
+from digest_cache import DigestCache
+from digest_index import DigestIndex
+from fast_json import FastJSONProvider
+from hash_executor import HashExecutor
+from local_files import hash_file, hash_manifest_entry, is_within_roots, tree_digest, walk_tree
+from merkle import LEAF_PREFIX, leaf_digest, leaf_ranges, merkle_root
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, SIZE_BUCKETS, MetricsRegistry
+from signing import SIGNING_MODES, SigningKeyring
+from upload_sessions import UploadSessionStore
+
+try:
+    import blake3 # Optional fast backend: pip install blake3
+except ImportError:
+    blake3 = None
+
+try:
+    import xxhash # Optional non-cryptographic backend: pip install xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    import msgpack # Optional MessagePack responses: pip install msgpack
+except ImportError:
+    msgpack = None
 
 app = Flask(__name__)
+# Compact JSON encoding/decoding, backed by orjson when it is installed.
+app.json = FastJSONProvider(app)
+
+# Upper bound on the number of texts accepted by a single /api/hash/batch request.
+app.config['MAX_BATCH_ITEMS'] = 10000
+# Longest single line (in bytes) accepted by the /api/hash/stream NDJSON endpoint.
+app.config['MAX_NDJSON_LINE_BYTES'] = 1024 * 1024
+# Number of bytes read from the request stream per hasher update when hashing raw bodies.
+app.config['HASH_CHUNK_SIZE'] = 64 * 1024
+# Default leaf size in bytes for Merkle tree hashing (/api/hash/merkle).
+app.config['MERKLE_LEAF_SIZE'] = 1024 * 1024
+# Most bytes of a Merkle request body buffered at once for parallel leaf hashing,
+# whatever the leaf size; leaves larger than this are hashed one at a time as they stream in.
+app.config['MERKLE_MAX_BUFFER_BYTES'] = 16 * 1024 * 1024
+# Resumable upload sessions (/api/hash/sessions): seconds an idle session is kept,
+# and the most sessions open at once.
+app.config['UPLOAD_SESSION_TTL'] = 3600
+app.config['UPLOAD_SESSION_MAX'] = 1000
+# Secret keys for /api/sign, by key ID (bytes, or str encoded as UTF-8). Clients only
+# ever send the key ID. Load the secrets from the environment or a secrets store.
+app.config['SIGNING_KEYS'] = {}
+# Limits for multipart file uploads: files per request, and bytes kept in memory for
+# each ordinary (non-file) form field. File contents are hashed as they arrive.
+app.config['MAX_UPLOAD_FILES'] = 100
+app.config['MAX_UPLOAD_FIELD_BYTES'] = 64 * 1024
+# Optional in-process LRU cache of digests keyed by (algorithm, input).
+app.config['DIGEST_CACHE_ENABLED'] = False
+app.config['DIGEST_CACHE_MAX_BYTES'] = 64 * 1024 * 1024 # Approximate memory budget for all entries
+app.config['DIGEST_CACHE_TTL'] = 300 # Seconds an entry stays valid; None disables expiry
+app.config['DIGEST_CACHE_MAX_ENTRY_BYTES'] = 64 * 1024 # Larger inputs bypass the cache
+# Parallel hashing of large batches and buffers: pool kind ('thread', 'process' or None
+# to always hash inline), worker count (None means one per CPU) and the workload size
+# in bytes below which hashing stays inline.
+app.config['HASH_EXECUTOR_KIND'] = 'thread'
+app.config['HASH_EXECUTOR_WORKERS'] = None
+app.config['HASH_EXECUTOR_INLINE_THRESHOLD'] = 1024 * 1024
+# Server-local file and directory hashing (/api/hash/local) is off unless directories
+# are listed here; only paths inside them can be hashed. Directory walks stop at
+# LOCAL_HASH_MAX_FILES files.
+app.config['LOCAL_HASH_ROOTS'] = []
+app.config['LOCAL_HASH_MAX_FILES'] = 100000
+# Known-digest index for membership checks ('check_known' on /api/hash, and /api/known):
+# a sorted file of raw digests built with digest_index.py, an optional Bloom filter
+# file built alongside it, and the algorithm the digests were computed with.
+app.config['DIGEST_INDEX_PATH'] = None
+app.config['DIGEST_INDEX_BLOOM_PATH'] = None
+app.config['DIGEST_INDEX_ALGORITHM'] = 'sha256'
+# Upper bound on the number of digests accepted by a single /api/known request.
+app.config['MAX_KNOWN_LOOKUP_ITEMS'] = 100000
+# Request, per-stage and error metrics served at /metrics.
+app.config['METRICS_ENABLED'] = True
+
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/jsonl', 'application/jsonlines')
+
+# Response formats offered by /api/hash, in order of preference for 'Accept: */*'.
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack', 'application/vnd.msgpack')
+RAW_DIGEST_MIMETYPE = 'application/octet-stream'
+
+DEFAULT_ALGORITHM = 'sha256'
+
+# Smallest and largest leaf size (bytes) a client may request for Merkle tree hashing.
+MERKLE_LEAF_SIZE_LIMITS = (1024, 64 * 1024 * 1024)
+
+# Output length in bytes used for the variable-length SHAKE algorithms.
+SHAKE_DIGEST_SIZES = {'shake_128': 32, 'shake_256': 64}
+
+# Registry of supported algorithms: name -> {'factory', 'backend', 'digest_size'}.
+# The factory takes no arguments and returns a new hasher object offering
+# update(), digest() and hexdigest().
+HASH_ALGORITHMS = {}
+
+# Cache of measured throughputs (MB/s) keyed by algorithm name.
+_algorithm_throughput = {}
+
+# The DigestCache instance, created from app.config on first use.
+_digest_cache = None
+_digest_cache_lock = threading.Lock()
+
+metrics_registry = MetricsRegistry()
+REQUEST_COUNT = metrics_registry.counter(
+    'hasher_http_requests_total', "HTTP requests handled, by route, method and status.", ('route', 'method', 'status'))
+REQUEST_LATENCY = metrics_registry.histogram(
+    'hasher_http_request_duration_seconds', "Time spent handling a request, by route.", ('route',))
+STAGE_LATENCY = metrics_registry.histogram(
+    'hasher_stage_duration_seconds', "Time spent in each stage of a request, by route and stage.", ('route', 'stage'))
+REQUEST_PAYLOAD_SIZE = metrics_registry.histogram(
+    'hasher_request_payload_bytes', "Request body sizes (Content-Length), by route.", ('route',), buckets=SIZE_BUCKETS)
+BYTES_HASHED = metrics_registry.counter(
+    'hasher_bytes_hashed_total', "Bytes fed to hashers, by algorithm.", ('algorithm',))
+VALIDATION_ERRORS = metrics_registry.counter(
+    'hasher_validation_errors_total', "Rejected requests, by route and validation branch.", ('route', 'reason'))
+
+# The HashExecutor instance, created from app.config on first use.
+_hash_executor = None
+_hash_executor_lock = threading.Lock()
+
+# The SigningKeyring instance, created from app.config on first use.
+_signing_keyring = None
+_signing_keyring_lock = threading.Lock()
+
+# The UploadSessionStore instance, created from app.config on first use.
+_upload_sessions = None
+_upload_sessions_lock = threading.Lock()
+
+# The DigestIndex instance, mapped from app.config on first use.
+_digest_index = None
+_digest_index_lock = threading.Lock()
+
+class ShakeHasher:
+    """Wraps a SHAKE hasher so that digest() and hexdigest() need no length argument."""
+
+    def __init__(self, name, length, shake=None):
+        self._shake = shake if shake is not None else hashlib.new(name)
+        self.name = name
+        self.digest_size = length
+
+    def update(self, data):
+        self._shake.update(data)
+
+    def digest(self):
+        return self._shake.digest(self.digest_size)
+
+    def hexdigest(self):
+        return self._shake.hexdigest(self.digest_size)
+
+    def copy(self):
+        return ShakeHasher(self.name, self.digest_size, self._shake.copy())
+
+def register_algorithm(name, factory, backend):
+    """
+    Adds a hash algorithm to the registry.
+
+    Args:
+        name (str): The lowercase name clients use to select the algorithm.
+        factory (callable): Returns a new hasher object when called without arguments.
+        backend (str): The library providing the implementation (e.g. 'hashlib').
+    """
+    HASH_ALGORITHMS[name] = {
+        "factory": factory,
+        "backend": backend,
+        "digest_size": len(factory().digest())
+    }
+
+def register_default_algorithms():
+    """
+    Registers every usable hashlib algorithm plus any installed optional backends.
+
+    Algorithms listed in hashlib.algorithms_available that cannot actually be
+    constructed (e.g. legacy OpenSSL digests that are disabled) are skipped.
+    """
+    for name in sorted(hashlib.algorithms_available):
+        name = name.lower()
+        if name in SHAKE_DIGEST_SIZES:
+            factory = functools.partial(ShakeHasher, name, SHAKE_DIGEST_SIZES[name])
+        else:
+            # The named constructors (hashlib.sha256, ...) are faster than hashlib.new.
+            factory = getattr(hashlib, name, None) or functools.partial(hashlib.new, name)
+        try:
+            factory()
+        except ValueError:
+            continue
+        register_algorithm(name, factory, 'hashlib')
+
+    if blake3 is not None:
+        register_algorithm('blake3', blake3.blake3, 'blake3')
+
+    if xxhash is not None:
+        for name in ('xxh32', 'xxh64', 'xxh3_64', 'xxh3_128'):
+            register_algorithm(name, getattr(xxhash, name), 'xxhash')
+
+register_default_algorithms()
+
+def new_hasher(algorithm=DEFAULT_ALGORITHM):
+    """
+    Creates a new hasher object for a registered algorithm.
+
+    Args:
+        algorithm (str): A name from HASH_ALGORITHMS.
+
+    Returns:
+        object: A fresh hasher offering update(), digest() and hexdigest().
+    """
+    return HASH_ALGORITHMS[algorithm]['factory']()
+
+def measure_algorithm_throughput(algorithm, sample_size=1024 * 1024, rounds=3):
+    """
+    Measures how fast an algorithm hashes on this machine.
+
+    The best of several rounds over an in-memory sample is used, and the result
+    is cached so each algorithm is only measured once per process.
+
+    Args:
+        algorithm (str): A name from HASH_ALGORITHMS.
+        sample_size (int): The number of bytes hashed per round.
+        rounds (int): The number of timed rounds.
+
+    Returns:
+        float: The measured throughput in megabytes (10^6 bytes) per second.
+    """
+    throughput = _algorithm_throughput.get(algorithm)
+    if throughput is None:
+        sample = bytes(sample_size)
+        best = float('inf')
+        for _ in range(rounds):
+            start = time.perf_counter()
+            hasher = new_hasher(algorithm)
+            hasher.update(sample)
+            hasher.digest()
+            best = min(best, time.perf_counter() - start)
+        throughput = round(sample_size / max(best, 1e-9) / 1e6, 1)
+        _algorithm_throughput[algorithm] = throughput
+    return throughput
+
+def get_digest_cache():
+    """
+    Returns the shared digest cache, creating it from app.config on first use.
+
+    Returns:
+        DigestCache: The cache instance, or None if DIGEST_CACHE_ENABLED is off.
+    """
+    global _digest_cache
+    if not app.config['DIGEST_CACHE_ENABLED']:
+        return None
+    if _digest_cache is None:
+        with _digest_cache_lock:
+            if _digest_cache is None:
+                _digest_cache = DigestCache(
+                    max_bytes=app.config['DIGEST_CACHE_MAX_BYTES'],
+                    ttl=app.config['DIGEST_CACHE_TTL'],
+                    max_entry_bytes=app.config['DIGEST_CACHE_MAX_ENTRY_BYTES'])
+    return _digest_cache
+
+def get_hash_executor():
+    """
+    Returns the shared hashing executor, creating it from app.config on first use.
+
+    Returns:
+        HashExecutor: The executor instance.
+    """
+    global _hash_executor
+    if _hash_executor is None:
+        with _hash_executor_lock:
+            if _hash_executor is None:
+                _hash_executor = HashExecutor(
+                    kind=app.config['HASH_EXECUTOR_KIND'],
+                    max_workers=app.config['HASH_EXECUTOR_WORKERS'],
+                    inline_threshold=app.config['HASH_EXECUTOR_INLINE_THRESHOLD'])
+    return _hash_executor
+
+def get_upload_sessions():
+    """
+    Returns the shared upload session store, creating it from app.config on first use.
+
+    Returns:
+        UploadSessionStore: The store instance.
+    """
+    global _upload_sessions
+    if _upload_sessions is None:
+        with _upload_sessions_lock:
+            if _upload_sessions is None:
+                _upload_sessions = UploadSessionStore(
+                    ttl=app.config['UPLOAD_SESSION_TTL'],
+                    max_sessions=app.config['UPLOAD_SESSION_MAX'])
+    return _upload_sessions
+
+def get_signing_keyring():
+    """
+    Returns the shared signing keyring, creating it from app.config on first use.
+
+    Returns:
+        SigningKeyring: The keyring instance.
+
+    Raises:
+        ValueError: If a key in SIGNING_KEYS is empty.
+    """
+    global _signing_keyring
+    if _signing_keyring is None:
+        with _signing_keyring_lock:
+            if _signing_keyring is None:
+                _signing_keyring = SigningKeyring(app.config['SIGNING_KEYS'])
+    return _signing_keyring
+
+def get_digest_index():
+    """
+    Returns the shared known-digest index, mapping it from app.config on first use.
+
+    Returns:
+        DigestIndex: The index instance, or None if DIGEST_INDEX_PATH is not set.
+
+    Raises:
+        OSError: If the index or Bloom filter file cannot be opened.
+        ValueError: If a file is malformed.
+    """
+    global _digest_index
+    if app.config['DIGEST_INDEX_PATH'] is None:
+        return None
+    if _digest_index is None:
+        with _digest_index_lock:
+            if _digest_index is None:
+                algorithm = app.config['DIGEST_INDEX_ALGORITHM']
+                _digest_index = DigestIndex(app.config['DIGEST_INDEX_PATH'],
+                                            digest_size=HASH_ALGORITHMS[algorithm]['digest_size'],
+                                            bloom_path=app.config['DIGEST_INDEX_BLOOM_PATH'])
+    return _digest_index
+
+def utf8_length(text):
+    """Returns the UTF-8 encoded length of a string, without encoding it when it is ASCII."""
+    return len(text) if text.isascii() else len(text.encode('utf-8'))
+
+def count_hashed_texts(texts, algorithms):
+    """
+    Adds the UTF-8 length of hashed strings to BYTES_HASHED for each algorithm.
+
+    The string hashing functions may run in a 'process' executor pool, whose
+    counters are never collected, so request handlers count their inputs here
+    instead.
+
+    Args:
+        texts (list): The strings that were hashed.
+        algorithms (list): Names from HASH_ALGORITHMS each string was hashed with.
+    """
+    byte_count = sum(utf8_length(text) for text in texts)
+    for algorithm in algorithms:
+        BYTES_HASHED.inc(byte_count, algorithm=algorithm)
+
+def count_verified_texts(items, outcomes, default_algorithm):
+    """Counts the texts hashed by verify_digest() (every item without an 'error' outcome) in BYTES_HASHED."""
+    byte_counts = {}
+    for item, (outcome, _) in zip(items, outcomes):
+        if outcome != 'error':
+            algorithm = item.get('algorithm', default_algorithm).lower()
+            byte_counts[algorithm] = byte_counts.get(algorithm, 0) + utf8_length(item['text'])
+    for algorithm, byte_count in byte_counts.items():
+        BYTES_HASHED.inc(byte_count, algorithm=algorithm)
+
+def calculate_bytes_hash(data, algorithm=DEFAULT_ALGORITHM):
+    """
+    Calculates the hash of a bytes-like object.
+
+    Args:
+        data: The bytes (or memoryview) to be hashed.
+        algorithm (str): A name from HASH_ALGORITHMS (defaults to 'sha256').
+
+    Returns:
+        str: The hexadecimal representation of the hash.
+    """
+    hasher = new_hasher(algorithm)
+    hasher.update(data)
+    return hasher.hexdigest()
+
+def calculate_hash(input_string, algorithm=DEFAULT_ALGORITHM, timings=None):
+    """
+    Calculates the hash of a given input string with a registered algorithm.
+
+    When the digest cache is enabled, repeated inputs are answered from it.
+
+    Args:
+        input_string (str): The string to be hashed.
+        algorithm (str): A name from HASH_ALGORITHMS (defaults to 'sha256').
+        timings (dict): If given, receives the seconds spent in the 'encode'
+                        and 'hash' stages.
+
+    Returns:
+        str: The hexadecimal representation of the hash.
+             Returns None if the input is not a string (this function
+             primarily expects type validation to occur before calling).
+    """
+    if not isinstance(input_string, str):
+        return None
+
+    digest_cache = get_digest_cache()
+    if digest_cache is not None:
+        cached_value = digest_cache.get(algorithm, input_string)
+        if cached_value is not None:
+            return cached_value
+
+    started = time.perf_counter()
+    encoded_text = input_string.encode('utf-8') # Input string must be encoded to bytes for hashing
+    encoded = time.perf_counter()
+    hashed_value = calculate_bytes_hash(encoded_text, algorithm)
+    if timings is not None:
+        timings['encode'] = encoded - started
+        timings['hash'] = time.perf_counter() - encoded
+
+    if digest_cache is not None:
+        digest_cache.put(algorithm, input_string, hashed_value)
+    return hashed_value
+
+def calculate_sha256_hash(input_string):
+    """
+    Calculates the SHA-256 hash of a given input string.
+
+    Args:
+        input_string (str): The string to be hashed.
+
+    Returns:
+        str: The hexadecimal representation of the SHA-256 hash.
+             Returns None if the input is not a string (this function
+             primarily expects type validation to occur before calling).
+    """
+    return calculate_hash(input_string, 'sha256')
+
+def calculate_merkle_leaves(buffer, byte_count, leaf_size, algorithm):
+    """
+    Hashes the leaves of a buffer, in parallel on the hashing executor when it is large.
+
+    Args:
+        buffer: A bytes-like object shared (not copied) between threads.
+        byte_count (int): The number of bytes of buffer to hash.
+        leaf_size (int): The number of bytes per leaf.
+        algorithm (str): A name from HASH_ALGORITHMS.
+
+    Returns:
+        list: The leaf digests (bytes) in order.
+    """
+    leaf_functions = [functools.partial(leaf_digest, start=start, end=end, algorithm=algorithm, new_hasher=new_hasher)
+                      for start, end in leaf_ranges(byte_count, leaf_size)]
+    BYTES_HASHED.inc(byte_count, algorithm=algorithm)
+    return get_hash_executor().map_buffer(leaf_functions, buffer)
+
+def calculate_sequential_merkle_leaves(stream, leaf_size, algorithm):
+    """
+    Hashes the leaves of a binary stream one after another, reading HASH_CHUNK_SIZE bytes at a time.
+
+    Args:
+        stream: A binary file-like object.
+        leaf_size (int): Bytes per leaf.
+        algorithm (str): A name from HASH_ALGORITHMS.
+
+    Returns:
+        tuple: (leaves, byte_count) where leaves are the leaf digests (bytes) in order.
+    """
+    chunk_size = app.config['HASH_CHUNK_SIZE']
+    leaves = []
+    byte_count = 0
+    while True:
+        hasher = new_hasher(algorithm)
+        hasher.update(LEAF_PREFIX)
+        leaf_bytes = 0
+        while leaf_bytes < leaf_size:
+            chunk = stream.read(min(chunk_size, leaf_size - leaf_bytes))
+            if not chunk:
+                break
+            hasher.update(chunk)
+            leaf_bytes += len(chunk)
+        if leaf_bytes or not leaves: # Empty input still has one (empty) leaf
+            leaves.append(hasher.digest())
+        byte_count += leaf_bytes
+        if leaf_bytes < leaf_size:
+            break
+    BYTES_HASHED.inc(byte_count, algorithm=algorithm)
+    return leaves, byte_count
+
+def calculate_stream_merkle_tree(stream, leaf_size, algorithm=DEFAULT_ALGORITHM, max_buffer_bytes=None):
+    """
+    Calculates a Merkle tree hash of a binary stream without buffering all of it.
+
+    The stream is read one group of leaves at a time (up to one leaf per
+    executor worker, and at most max_buffer_bytes), and each group's leaves
+    are hashed in parallel before the next group is read. Leaves larger than
+    max_buffer_bytes are instead hashed one at a time, chunk by chunk, so
+    memory use never depends on the client-chosen leaf size.
+
+    Args:
+        stream: A binary file-like object such as flask.request.stream.
+        leaf_size (int): Bytes per leaf.
+        algorithm (str): A name from HASH_ALGORITHMS.
+        max_buffer_bytes (int): Upper bound on buffered input
+                                (defaults to app.config['MERKLE_MAX_BUFFER_BYTES']).
+
+    Returns:
+        tuple: (root, leaves, byte_count) where root and leaves are hexadecimal strings.
+    """
+    if max_buffer_bytes is None:
+        max_buffer_bytes = app.config['MERKLE_MAX_BUFFER_BYTES']
+    if leaf_size > max_buffer_bytes:
+        leaves, byte_count = calculate_sequential_merkle_leaves(stream, leaf_size, algorithm)
+        return merkle_root(leaves, algorithm, new_hasher).hex(), [leaf.hex() for leaf in leaves], byte_count
+
+    group_size = leaf_size * min(get_hash_executor().max_workers, max_buffer_bytes // leaf_size)
+    leaves = []
+    byte_count = 0
+    while True:
+        buffer = bytearray()
+        while len(buffer) < group_size:
+            chunk = stream.read(group_size - len(buffer))
+            if not chunk:
+                break
+            buffer += chunk
+        if buffer or not leaves: # Empty input still has one (empty) leaf
+            leaves.extend(calculate_merkle_leaves(buffer, len(buffer), leaf_size, algorithm))
+        byte_count += len(buffer)
+        if len(buffer) < group_size:
+            break
+    return merkle_root(leaves, algorithm, new_hasher).hex(), [leaf.hex() for leaf in leaves], byte_count
+
+def calculate_hashes(input_string, algorithms, chunk_size=None, timings=None):
+    """
+    Calculates several hashes of a given input string in a single pass.
+
+    The string is encoded once and its bytes are walked in chunks, with every
+    chunk fed to each hasher while it is still hot in the CPU cache. Inputs
+    above the executor's inline threshold are instead hashed by all algorithms
+    in parallel threads sharing the encoded buffer.
+
+    Args:
+        input_string (str): The string to be hashed.
+        algorithms (list): Names from HASH_ALGORITHMS.
+        chunk_size (int): Bytes fed to every hasher per step
+                          (defaults to app.config['HASH_CHUNK_SIZE']).
+        timings (dict): If given, receives the seconds spent in the 'encode'
+                        and 'hash' stages.
+
+    Returns:
+        dict: Maps each algorithm name to the hexadecimal hash.
+              Returns None if the input is not a string.
+    """
+    if not isinstance(input_string, str):
+        return None
+    if chunk_size is None:
+        chunk_size = app.config['HASH_CHUNK_SIZE']
+    started = time.perf_counter()
+    encoded_text = memoryview(input_string.encode('utf-8')) # Slicing a memoryview does not copy the bytes
+    encoded = time.perf_counter()
+
+    hash_executor = get_hash_executor()
+    if len(algorithms) > 1 and hash_executor.should_offload(len(encoded_text)):
+        hash_functions = [functools.partial(calculate_bytes_hash, algorithm=algorithm) for algorithm in algorithms]
+        hashed_values = dict(zip(algorithms, hash_executor.map_buffer(hash_functions, encoded_text)))
+    else:
+        hashers = {algorithm: new_hasher(algorithm) for algorithm in algorithms}
+        for offset in range(0, len(encoded_text), chunk_size):
+            chunk = encoded_text[offset:offset + chunk_size]
+            for hasher in hashers.values():
+                hasher.update(chunk)
+        hashed_values = {algorithm: hasher.hexdigest() for algorithm, hasher in hashers.items()}
+
+    if timings is not None:
+        timings['encode'] = encoded - started
+        timings['hash'] = time.perf_counter() - encoded
+    return hashed_values
+
+def calculate_selected_hashes(input_string, algorithms, multiple):
+    """
+    Hashes a string according to a selection returned by select_algorithms().
+
+    Args:
+        input_string (str): The string to be hashed.
+        algorithms (list): Names from HASH_ALGORITHMS.
+        multiple (bool): Whether the 'algorithms' list form was requested.
+
+    Returns:
+        dict or str: The algorithm -> hash mapping if multiple is True,
+                     otherwise the single hexadecimal hash.
+    """
+    if multiple:
+        return calculate_hashes(input_string, algorithms)
+    return calculate_hash(input_string, algorithms[0])
+
+def calculate_stream_hashes(stream, chunk_size, algorithms):
+    """
+    Calculates several hashes of a binary stream in a single pass.
+
+    The stream is read in fixed-size chunks and every chunk is fed to each
+    hasher, so the stream is read once and at most one chunk is held in
+    memory regardless of stream length or the number of algorithms.
+
+    Args:
+        stream: A binary file-like object such as flask.request.stream.
+        chunk_size (int): The maximum number of bytes read per chunk.
+        algorithms (list): Names from HASH_ALGORITHMS.
+
+    Returns:
+        tuple: (hexdigests, byte_count) where hexdigests maps each algorithm
+               name to the hexadecimal hash and byte_count is the number of
+               bytes hashed.
+    """
+    hashers = {algorithm: new_hasher(algorithm) for algorithm in algorithms}
+    byte_count = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        for hasher in hashers.values():
+            hasher.update(chunk)
+        byte_count += len(chunk)
+    for algorithm in algorithms:
+        BYTES_HASHED.inc(byte_count, algorithm=algorithm)
+    return {algorithm: hasher.hexdigest() for algorithm, hasher in hashers.items()}, byte_count
+
+def validate_text_value(value, field_name="'text' field"):
+    """
+    Validates a value that is about to be hashed.
+
+    Args:
+        value: The value taken from the request payload.
+        field_name (str): How the value is referred to in the error message.
+
+    Returns:
+        str: An error message describing why the value cannot be hashed,
+             or None if the value is a non-empty string.
+    """
+    if not isinstance(value, str):
+        return f"{field_name} must be a string"
+    if not value.strip(): # Reject empty strings and strings made only of whitespace
+        return f"{field_name} cannot be empty or consist only of whitespace"
+    return None
+
+def validate_algorithm_value(value):
+    """
+    Validates a requested algorithm name.
+
+    Args:
+        value: The 'algorithm' value taken from the request.
+
+    Returns:
+        str: An error message if the value is not a string or names an
+             algorithm missing from HASH_ALGORITHMS, otherwise None.
+             Names are matched case-insensitively.
+    """
+    if not isinstance(value, str):
+        return "'algorithm' field must be a string"
+    if value.lower() not in HASH_ALGORITHMS:
+        return f"Unsupported hash algorithm: '{value}'"
+    return None
+
+def verify_digest(item, default_algorithm=DEFAULT_ALGORITHM):
+    """
+    Hashes one (text, expected digest) pair and compares the digests in constant time.
+
+    Args:
+        item: An object with 'text', 'expected' (a hexadecimal digest, any case)
+              and optionally 'algorithm' (overriding default_algorithm) and 'id'.
+        default_algorithm (str): The algorithm used when the item names none.
+
+    Returns:
+        tuple: (outcome, details) where outcome is 'match', 'mismatch' or 'error'.
+               details is None for a match; for a mismatch it holds 'algorithm',
+               'expected' and 'actual'; for an error it holds an 'error' message.
+               The item's 'id', if any, is included in details.
+    """
+    if not isinstance(item, dict):
+        return 'error', {"error": "Item must be a JSON object"}
+    details = {"id": item['id']} if 'id' in item else {}
+
+    text_to_hash = item.get('text')
+    if text_to_hash is None:
+        return 'error', {**details, "error": "Missing 'text' field in JSON data"}
+    validation_error = validate_text_value(text_to_hash)
+    if validation_error is not None:
+        return 'error', {**details, "error": validation_error}
+
+    expected = item.get('expected')
+    if expected is None:
+        return 'error', {**details, "error": "Missing 'expected' field in JSON data"}
+    if not isinstance(expected, str) or not expected.isascii():
+        return 'error', {**details, "error": "'expected' field must be a hexadecimal string"}
+
+    algorithm = item.get('algorithm', default_algorithm)
+    algorithm_error = validate_algorithm_value(algorithm)
+    if algorithm_error is not None:
+        return 'error', {**details, "error": algorithm_error}
+    algorithm = algorithm.lower()
+
+    actual = calculate_hash(text_to_hash, algorithm)
+    if hmac.compare_digest(actual, expected.lower()): # Constant time, so timing does not reveal the digest
+        return 'match', None
+    return 'mismatch', {**details, "algorithm": algorithm, "expected": expected, "actual": actual}
+
+def select_signing_options(data):
+    """
+    Reads and validates the key, mode and algorithm of a signing request.
+
+    Args:
+        data (dict): The JSON payload with 'key_id', and optionally 'mode'
+                     ('hmac' by default, or 'blake2') and 'algorithm' (defaults
+                     to 'sha256' for HMAC and 'blake2b' for keyed BLAKE2).
+
+    Returns:
+        tuple: (key_id, mode, algorithm, error) where error is an error message
+               (with the other values None) if the options are invalid.
+    """
+    key_id = data.get('key_id')
+    if key_id is None:
+        return None, None, None, "Missing 'key_id' field in JSON data"
+    if not isinstance(key_id, str):
+        return None, None, None, "'key_id' field must be a string"
+    keyring = get_signing_keyring()
+    if key_id not in keyring:
+        return None, None, None, f"Unknown key ID: '{key_id}'"
+
+    mode = data.get('mode', 'hmac')
+    if mode not in SIGNING_MODES:
+        return None, None, None, f"Unsupported signing mode: '{mode}'"
+
+    algorithm = data.get('algorithm', DEFAULT_ALGORITHM if mode == 'hmac' else 'blake2b')
+    algorithm_error = validate_algorithm_value(algorithm)
+    if algorithm_error is not None:
+        return None, None, None, algorithm_error
+    algorithm = algorithm.lower()
+    if mode == 'hmac' and (HASH_ALGORITHMS[algorithm]['backend'] != 'hashlib' or algorithm in SHAKE_DIGEST_SIZES):
+        return None, None, None, f"Algorithm '{algorithm}' cannot be used for HMAC"
+
+    signing_error = keyring.check(key_id, mode, algorithm)
+    if signing_error is not None:
+        return None, None, None, signing_error
+    return key_id, mode, algorithm, None
+
+def select_algorithms(options, default_algorithm=DEFAULT_ALGORITHM):
+    """
+    Reads the requested algorithm selection from a request payload.
+
+    A payload names either a single 'algorithm' or a list of 'algorithms'.
+    Several algorithms are computed together in one pass over the input and
+    reported as a 'hashed_values' mapping instead of a single 'hashed_value'.
+
+    Args:
+        options (dict): The JSON payload, or query options from get_query_algorithm_options().
+        default_algorithm (str): Used when neither field is present.
+
+    Returns:
+        tuple: (algorithms, multiple, error) where algorithms is a list of
+               lowercase, de-duplicated names, multiple is True if the
+               'algorithms' list form was used, and error is an error
+               message (with the other values None) if the selection is invalid.
+    """
+    if options.get('algorithms') is not None:
+        if options.get('algorithm') is not None:
+            return None, None, "Specify either 'algorithm' or 'algorithms', not both"
+        algorithms = options['algorithms']
+        if not isinstance(algorithms, list) or not algorithms:
+            return None, None, "'algorithms' field must be a non-empty array of strings"
+        for algorithm in algorithms:
+            algorithm_error = validate_algorithm_value(algorithm)
+            if algorithm_error is not None:
+                return None, None, algorithm_error
+        return list(dict.fromkeys(algorithm.lower() for algorithm in algorithms)), True, None
+
+    algorithm = options.get('algorithm', default_algorithm)
+    algorithm_error = validate_algorithm_value(algorithm)
+    if algorithm_error is not None:
+        return None, None, algorithm_error
+    return [algorithm.lower()], False, None
+
+def select_known_check(options, algorithms):
+    """
+    Reads the 'check_known' option of an /api/hash request.
+
+    Args:
+        options (dict): The request's JSON object.
+        algorithms (list): The algorithms chosen by select_algorithms().
+
+    Returns:
+        tuple: (digest_index, error, reason) where digest_index is the known-digest
+               index to look the digest up in (None if 'check_known' is not set),
+               and error and reason are the message and metric label of an invalid
+               option (both None otherwise).
+    """
+    check_known = options.get('check_known', False)
+    if not isinstance(check_known, bool):
+        return None, "'check_known' field must be a boolean", 'invalid_check_known'
+    if not check_known:
+        return None, None, None
+    digest_index = get_digest_index()
+    if digest_index is None:
+        return None, "No known-digest index is configured on this server", 'index_unavailable'
+    index_algorithm = app.config['DIGEST_INDEX_ALGORITHM']
+    if index_algorithm not in algorithms:
+        return None, (f"'check_known' requires the '{index_algorithm}' algorithm, "
+                      "which the known-digest index is built with"), 'invalid_algorithm'
+    return digest_index, None, None
+
+def is_known_digest(digest_index, hashed_values, multiple):
+    """Looks the DIGEST_INDEX_ALGORITHM digest of an /api/hash result up in the known-digest index."""
+    hex_digest = hashed_values[app.config['DIGEST_INDEX_ALGORITHM']] if multiple else hashed_values
+    return bytes.fromhex(hex_digest) in digest_index
+
+def get_algorithm_options(values):
+    """
+    Collects an algorithm selection from string values such as query or form fields.
+
+    Args:
+        values (Mapping): Maps parameter names to string values.
+
+    Returns:
+        dict: Contains 'algorithm' (str) and/or 'algorithms' (a list split
+              from the comma-separated parameter) if they were given.
+    """
+    options = {}
+    if 'algorithm' in values:
+        options['algorithm'] = values['algorithm']
+    if 'algorithms' in values:
+        options['algorithms'] = [name.strip() for name in values['algorithms'].split(',') if name.strip()]
+    return options
+
+def get_query_algorithm_options():
+    """
+    Collects the algorithm selection from the query string of the current request.
+
+    Returns:
+        dict: See get_algorithm_options().
+    """
+    return get_algorithm_options(request.args)
+
+def iter_ndjson_lines(stream, max_line_bytes):
+    """
+    Reads newline-delimited records from a binary stream one line at a time.
+
+    Only a single line is held in memory, so the memory used does not depend
+    on the size of the whole upload. Lines longer than max_line_bytes are
+    skipped up to their terminating newline instead of being buffered.
+
+    Args:
+        stream: A binary file-like object such as flask.request.stream.
+        max_line_bytes (int): The longest line that will be returned.
+
+    Yields:
+        tuple: (line_number, line) where line is the stripped line as bytes,
+               or None if the line was longer than max_line_bytes.
+               Blank lines are not yielded but are still counted.
+    """
+    line_number = 0
+    while True:
+        line = stream.readline(max_line_bytes + 1)
+        if not line:
+            return
+        line_number += 1
+
+        if len(line) > max_line_bytes and not line.endswith(b'\n'):
+            # Drain the remainder of the oversized line without keeping it.
+            while line and not line.endswith(b'\n'):
+                line = stream.readline(max_line_bytes + 1)
+            yield line_number, None
+            continue
+
+        line = line.strip()
+        if line:
+            yield line_number, line
+
+def hash_multipart_stream(stream, boundary, chunk_size, algorithm_options=None,
+                          max_files=None, max_field_bytes=None):
+    """
+    Hashes every file in a multipart/form-data body while it is being parsed.
+
+    The body is read in chunks and fed to Werkzeug's incremental multipart
+    decoder. Each piece of file data is passed to the file's hashers and then
+    dropped, so no file is ever held whole in memory or written to disk.
+    Ordinary form fields are kept (up to max_field_bytes each) because they may
+    select the algorithm.
+
+    The algorithms for a file are chosen when its part starts: from
+    algorithm_options if it is not empty (e.g. the query string), otherwise
+    from the 'algorithm' or 'algorithms' form fields received before the file.
+    File inputs submitted without a file (empty filename) are ignored.
+
+    Args:
+        stream: A binary file-like object such as flask.request.stream.
+        boundary (bytes): The multipart boundary from the Content-Type header.
+        chunk_size (int): The maximum number of bytes read per step.
+        algorithm_options (dict): An algorithm selection that overrides the form fields.
+        max_files (int): The most files accepted (None for no limit).
+        max_field_bytes (int): The longest ordinary form field accepted (None for no limit).
+
+    Returns:
+        tuple: (files, fields, error) where files is a list of dicts with 'field',
+               'filename', 'byte_count' and either 'hashed_value' and 'algorithm'
+               or 'hashed_values', fields maps form field names to their text,
+               and error is an error message (with files and fields None) if the
+               body is malformed, exceeds a limit or selects an invalid algorithm.
+    """
+    decoder = MultipartDecoder(boundary)
+    files = []
+    fields = {}
+    field_name = field_value = None # The ordinary form field being received
+    upload = hashers = None # The file being received and its hashers
+    multiple = False
+
+    while True:
+        chunk = stream.read(chunk_size)
+        decoder.receive_data(chunk or None) # None marks the end of the body
+        try:
+            event = decoder.next_event()
+            while not isinstance(event, NeedData):
+                if isinstance(event, (Field, File, Epilogue)):
+                    # A new part (or the end of the body) completes the previous part.
+                    if field_name is not None:
+                        fields[field_name] = field_value.decode('utf-8', 'replace')
+                    if upload is not None:
+                        files.append(finish_upload_hashes(upload, hashers, multiple))
+                    field_name = upload = None
+
+                if isinstance(event, Epilogue):
+                    return files, fields, None
+                if isinstance(event, Field):
+                    field_name, field_value = event.name, bytearray()
+                elif isinstance(event, File) and event.filename: # A file input left empty has no filename
+                    if max_files is not None and len(files) >= max_files:
+                        return None, None, f"Upload cannot contain more than {max_files} files"
+                    algorithms, multiple, algorithm_error = select_algorithms(
+                        algorithm_options or get_algorithm_options(fields))
+                    if algorithm_error is not None:
+                        return None, None, algorithm_error
+                    upload = {"field": event.name, "filename": event.filename, "byte_count": 0}
+                    hashers = {algorithm: new_hasher(algorithm) for algorithm in algorithms}
+                elif isinstance(event, Data):
+                    if field_name is not None:
+                        field_value += event.data
+                        if max_field_bytes is not None and len(field_value) > max_field_bytes:
+                            return None, None, f"Form field '{field_name}' exceeds the maximum length of {max_field_bytes} bytes"
+                    elif upload is not None:
+                        for hasher in hashers.values():
+                            hasher.update(event.data)
+                        upload['byte_count'] += len(event.data)
+                event = decoder.next_event()
+        except ValueError:
+            return None, None, "Invalid or incomplete multipart/form-data body"
+
+def hash_request_uploads(algorithm_options=None):
+    """
+    Hashes the files of the current multipart/form-data request as they stream in.
+
+    Args:
+        algorithm_options (dict): An algorithm selection that overrides the form fields.
+
+    Returns:
+        tuple: (files, fields, error) as returned by hash_multipart_stream(). The
+               error also covers a missing or non-multipart content type.
+    """
+    boundary = request.mimetype_params.get('boundary')
+    if request.mimetype != 'multipart/form-data' or not boundary:
+        return None, None, "Request content type must be multipart/form-data"
+    return hash_multipart_stream(request.stream, boundary.encode('latin-1'), app.config['HASH_CHUNK_SIZE'],
+                                 algorithm_options, app.config['MAX_UPLOAD_FILES'],
+                                 app.config['MAX_UPLOAD_FIELD_BYTES'])
+
+def finish_upload_hashes(upload, hashers, multiple):
+    """
+    Adds the digests of a completely received upload to its result.
+
+    Args:
+        upload (dict): The result built by hash_multipart_stream() ('field', 'filename', 'byte_count').
+        hashers (dict): Maps algorithm names to hasher objects fed with the file data.
+        multiple (bool): Whether the 'algorithms' list form was requested.
+
+    Returns:
+        dict: upload, with 'hashed_values', or 'hashed_value' and 'algorithm'.
+    """
+    hashed_values = {algorithm: hasher.hexdigest() for algorithm, hasher in hashers.items()}
+    for algorithm in hashers:
+        BYTES_HASHED.inc(upload['byte_count'], algorithm=algorithm)
+    if multiple:
+        upload['hashed_values'] = hashed_values
+    else:
+        algorithm, hashed_value = next(iter(hashed_values.items()))
+        upload['hashed_value'] = hashed_value
+        upload['algorithm'] = algorithm
+    return upload
+
+def negotiate_hash_mimetype(accept_mimetypes=None):
+    """
+    Picks the /api/hash response format from the request's Accept header.
+
+    JSON is preferred when the client accepts anything (or sends no Accept
+    header), and is also the fallback when none of the offered formats is
+    acceptable. MessagePack is only offered when msgpack is installed.
+
+    Args:
+        accept_mimetypes (werkzeug.datastructures.MIMEAccept): The parsed Accept
+            header (defaults to that of the current Flask request).
+
+    Returns:
+        str: 'application/json', one of MSGPACK_MIMETYPES, or RAW_DIGEST_MIMETYPE.
+    """
+    offered = ['application/json', RAW_DIGEST_MIMETYPE]
+    if msgpack is not None:
+        offered[1:1] = MSGPACK_MIMETYPES
+    if accept_mimetypes is None:
+        accept_mimetypes = request.accept_mimetypes
+    return accept_mimetypes.best_match(offered, default='application/json')
 
-def calculate_sha256_hash(input_string):
+def build_hash_response(mimetype, text_to_hash, algorithms, multiple, hashed_values, include_text=True,
+                        known=None):
     """
-    Calculates the SHA-256 hash of a given input string.
+    Serializes a successful /api/hash result in the negotiated format.
+
+    * JSON: the documented object, with hex digests.
+    * MessagePack: the same keys, with digests as binary values instead of hex.
+    * Raw digest: the digest bytes only. With several algorithms the digests are
+      concatenated in the order given by the X-Hash-Algorithms header.
 
     Args:
-        input_string (str): The string to be hashed.
+        mimetype (str): The result of negotiate_hash_mimetype().
+        text_to_hash (str): The hashed text, echoed as 'original_text' when include_text is True.
+        algorithms (list): The algorithm names, in request order.
+        multiple (bool): Whether 'algorithms' was given instead of 'algorithm'.
+        hashed_values (str or dict): The hex digest, or a dict of algorithm -> hex digest.
+        include_text (bool): Whether JSON and MessagePack responses echo 'original_text'.
+        known (bool): The known-digest index result, reported as 'known' (or the
+                      X-Hash-Known header for raw digests); None when not requested.
 
     Returns:
-        str: The hexadecimal representation of the SHA-256 hash.
-             Returns None if the input is not a string (this function
-             primarily expects type validation to occur before calling).
+        flask.Response: The response with HTTP status 200.
     """
-    if not isinstance(input_string, str):
-        return None 
-    encoded_text = input_string.encode('utf-8') # Input string must be encoded to bytes for hashing
-    hasher = hashlib.sha256()
-    hasher.update(encoded_text)
-    return hasher.hexdigest()
+    if mimetype == RAW_DIGEST_MIMETYPE:
+        hex_digests = [hashed_values[algorithm] for algorithm in algorithms] if multiple else [hashed_values]
+        response = Response(b''.join(bytes.fromhex(hex_digest) for hex_digest in hex_digests), mimetype=mimetype)
+        response.headers['X-Hash-Algorithms'] = ','.join(algorithms)
+        if known is not None:
+            response.headers['X-Hash-Known'] = 'true' if known else 'false'
+        return response
+
+    if mimetype in MSGPACK_MIMETYPES:
+        if multiple:
+            hashed_values = {algorithm: bytes.fromhex(hex_digest) for algorithm, hex_digest in hashed_values.items()}
+        else:
+            hashed_values = bytes.fromhex(hashed_values)
+
+    response_data = {"original_text": text_to_hash} if include_text else {}
+    if multiple:
+        response_data["hashed_values"] = hashed_values
+    else:
+        response_data["hashed_value"] = hashed_values
+        response_data["algorithm"] = algorithms[0]
+    if known is not None:
+        response_data["known"] = known
+
+    if mimetype in MSGPACK_MIMETYPES:
+        return Response(msgpack.packb(response_data), mimetype=mimetype)
+    return jsonify(response_data)
+
+def current_route():
+    """Returns the URL rule of the current request, used as the 'route' metric label."""
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+def error_response(message, reason, status=400, **fields):
+    """
+    Builds a JSON error response and counts it by validation branch.
+
+    Args:
+        message (str): The 'error' message returned to the client.
+        reason (str): A short, fixed label for the failed check (e.g. 'missing_text').
+        status (int): The HTTP status code.
+        **fields: Extra members of the JSON object (e.g. the expected 'offset').
+
+    Returns:
+        tuple: (flask.Response, status) as returned by view functions.
+    """
+    if app.config['METRICS_ENABLED']:
+        VALIDATION_ERRORS.inc(route=current_route(), reason=reason)
+    return jsonify({"error": message, **fields}), status
+
+def observe_stage(stage, started):
+    """
+    Records the time since started as one stage of the current request.
+
+    Args:
+        stage (str): The stage name (e.g. 'parse').
+        started (float): A time.perf_counter() value taken when the stage began.
+
+    Returns:
+        float: The current time.perf_counter() value, to start the next stage.
+    """
+    now = time.perf_counter()
+    if app.config['METRICS_ENABLED']:
+        STAGE_LATENCY.observe(now - started, route=current_route(), stage=stage)
+    return now
+
+@app.before_request
+def start_request_timer():
+    """Remembers when the request started for the latency metrics."""
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """
+    Counts the finished request and records its latency and payload size.
+
+    For streamed responses the latency covers the time until the response
+    starts, not the time to stream the whole body.
+    """
+    if app.config['METRICS_ENABLED']:
+        route = current_route()
+        REQUEST_COUNT.inc(route=route, method=request.method, status=str(response.status_code))
+        REQUEST_LATENCY.observe(time.perf_counter() - g.request_started, route=route)
+        if request.content_length is not None:
+            REQUEST_PAYLOAD_SIZE.observe(request.content_length, route=route)
+    return response
 
 @app.route('/', methods=['GET', 'POST'])
 def index_page():
@@ -28,81 +1129,1007 @@ def index_page():
     Renders the main HTML page for UI interaction and handles form submissions for hashing.
 
     On a GET request, it displays the form for text input.
-    On a POST request, it processes the submitted text, calculates its SHA-256 hash,
-    and re-renders the page displaying the original text, the calculated hash,
-    or an error message if the input text is invalid (e.g., empty).
+    On a POST request, it processes the submitted text, calculates its hash with the
+    selected algorithm (SHA-256 by default), and re-renders the page displaying the
+    original text, the calculated hash, or an error message if the input text or
+    algorithm is invalid (e.g., empty text).
 
     Returns:
-        str: The rendered HTML template ('index.html') populated with
-             context variables including original_text, hashed_value, and error_message.
+        str: The rendered HTML template ('index.html') populated with context variables
+             including original_text, hashed_value, algorithm, algorithms and error_message.
     """
     hashed_value = None
     original_text = None
     error_message = None
+    algorithm = DEFAULT_ALGORITHM
 
     if request.method == 'POST':
         original_text = request.form.get('inputText', '')
-        if not original_text.strip(): # Validate that input text is not empty or just whitespace
+        requested_algorithm = request.form.get('algorithm', DEFAULT_ALGORITHM)
+        if validate_algorithm_value(requested_algorithm) is not None:
+            error_message = f"Unsupported hash algorithm: {requested_algorithm}"
+        elif not original_text.strip(): # Validate that input text is not empty or just whitespace
             error_message = "Input text cannot be empty."
         else:
-            hashed_value = calculate_sha256_hash(original_text)
+            algorithm = requested_algorithm.lower()
+            hashed_value = calculate_hash(original_text, algorithm)
+            count_hashed_texts([original_text], [algorithm])
             if hashed_value is None: 
                  # This path is unlikely if original_text is a valid string from the form.
-                 # It primarily safeguards against unexpected issues in calculate_sha256_hash
+                 # It primarily safeguards against unexpected issues in calculate_hash
                  # if it were called with a non-string type from another part of the code.
                  error_message = "Error calculating hash for the provided input."
                 
     return render_template('index.html', 
                            original_text=original_text, 
                            hashed_value=hashed_value,
+                           algorithm=algorithm,
+                           algorithms=sorted(HASH_ALGORITHMS),
+                           error_message=error_message)
+
+@app.route('/upload', methods=['POST'])
+def upload_page():
+    """
+    Hashes the files uploaded through the web form's file section.
+
+    The multipart body is parsed and hashed as it arrives (see
+    hash_multipart_stream), so large files are never buffered. The form's
+    algorithm field precedes its file input and selects the algorithm.
+
+    Returns:
+        str: The rendered index.html with one result (filename, size and hash)
+             per uploaded file, or an error message.
+    """
+    files, fields, error_message = hash_request_uploads()
+    if error_message is None and not files:
+        error_message = "Choose at least one file to hash."
+    algorithm = (fields or {}).get('algorithm', DEFAULT_ALGORITHM).lower()
+    return render_template('index.html',
+                           original_text=None,
+                           hashed_value=None,
+                           algorithm=algorithm,
+                           algorithms=sorted(HASH_ALGORITHMS),
+                           upload_results=files,
                            error_message=error_message)
 
 @app.route('/api/hash', methods=['POST'])
 def api_hash():
     """
-    Provides a RESTful API endpoint for generating SHA-256 hashes.
+    Provides a RESTful API endpoint for generating hashes (SHA-256 by default).
 
     The endpoint expects a POST request with a JSON payload. The 'Content-Type'
     header must be 'application/json'. The JSON payload must contain a 'text'
-    field, which holds the string to be hashed.
+    field, which holds the string to be hashed, and may contain an 'algorithm'
+    field naming any algorithm listed by /api/algorithms, or an 'algorithms'
+    array to compute several hashes in a single pass over the input. Setting
+    'include_text' to false leaves 'original_text' out of the response. Setting
+    'check_known' to true looks the digest up in the known-digest index and
+    adds 'known' (true or false) to the response.
+
+    The success response format is negotiated from the Accept header: JSON by
+    default, MessagePack ('application/msgpack', when msgpack is installed), or
+    the raw digest bytes ('application/octet-stream'). Errors are always JSON.
 
     Returns:
-        flask.Response: A JSON response.
-            - On success (HTTP 200): Contains 'original_text' and 'hashed_value'.
+        flask.Response: A JSON, MessagePack or raw digest response.
+            - On success (HTTP 200): Contains 'original_text', 'hashed_value' and 'algorithm',
+              or 'original_text' and 'hashed_values' (algorithm -> hash) if 'algorithms' was given.
             - On client error (HTTP 400): Contains an 'error' message detailing the issue
               (e.g., wrong content type, malformed JSON, missing 'text' field,
-              invalid 'text' field type, or empty 'text' field).
+              invalid 'text' field type, empty 'text' field, unsupported algorithm,
+              non-boolean 'include_text' or 'check_known' field, or no index configured).
             - On server error (HTTP 500): Contains an 'error' message if an unexpected
               issue occurs during hash calculation.
     """
     if not request.is_json:
-        return jsonify({"error": "Request content type must be application/json"}), 400
+        return error_response("Request content type must be application/json", 'content_type')
 
+    stage_started = time.perf_counter()
     data = request.get_json(silent=True) # Use silent=True to handle malformed JSON gracefully
-    if data is None: # Check if JSON data is missing or could not be parsed
-        return jsonify({"error": "Invalid or missing JSON data in request body"}), 400
+    stage_started = observe_stage('parse', stage_started)
+    if not isinstance(data, dict): # Missing or malformed JSON, or a bare JSON array, string or number
+        return error_response("Invalid or missing JSON data in request body", 'invalid_json')
 
     text_to_hash = data.get('text')
 
     if text_to_hash is None: 
-        return jsonify({"error": "Missing 'text' field in JSON data"}), 400
+        return error_response("Missing 'text' field in JSON data", 'missing_text')
     
-    if not isinstance(text_to_hash, str):
-        return jsonify({"error": "'text' field must be a string"}), 400
+    validation_error = validate_text_value(text_to_hash)
+    if validation_error is not None:
+        return error_response(validation_error, 'invalid_text')
 
-    if not text_to_hash.strip(): # Validate that 'text' field is not empty or just whitespace
-        return jsonify({"error": "'text' field cannot be empty or consist only of whitespace"}), 400
+    algorithms, multiple, algorithm_error = select_algorithms(data)
+    if algorithm_error is not None:
+        return error_response(algorithm_error, 'invalid_algorithm')
 
-    hashed_value = calculate_sha256_hash(text_to_hash)
-    
-    if hashed_value is None:
+    include_text = data.get('include_text', True)
+    if not isinstance(include_text, bool):
+        return error_response("'include_text' field must be a boolean", 'invalid_include_text')
+
+    digest_index, known_error, known_reason = select_known_check(data, algorithms)
+    if known_error is not None:
+        return error_response(known_error, known_reason)
+    observe_stage('validate', stage_started)
+
+    timings = {}
+    if multiple:
+        hashed_values = calculate_hashes(text_to_hash, algorithms, timings=timings)
+    else:
+        hashed_values = calculate_hash(text_to_hash, algorithms[0], timings=timings)
+
+    if hashed_values is None:
         # This indicates an unexpected internal issue if text_to_hash passed all previous type and content checks.
-        return jsonify({"error": "Internal server error: Could not calculate hash"}), 500 
+        return error_response("Internal server error: Could not calculate hash", 'internal', 500)
+
+    count_hashed_texts([text_to_hash], algorithms)
+    if app.config['METRICS_ENABLED']:
+        for stage, seconds in timings.items(): # Absent when the digest cache answered
+            STAGE_LATENCY.observe(seconds, route=current_route(), stage=stage)
+
+    known = None
+    if digest_index is not None:
+        stage_started = time.perf_counter()
+        known = is_known_digest(digest_index, hashed_values, multiple)
+        observe_stage('lookup', stage_started)
+
+    stage_started = time.perf_counter()
+    response = build_hash_response(negotiate_hash_mimetype(), text_to_hash, algorithms, multiple,
+                                   hashed_values, include_text, known)
+    response.vary.add('Accept')
+    observe_stage('serialize', stage_started)
+    return response, 200
+
+@app.route('/api/hash/batch', methods=['POST'])
+def api_hash_batch():
+    """
+    Hashes many strings in a single request.
+
+    The endpoint expects a POST request with a JSON payload containing a 'texts'
+    field, which holds an array of strings, and may contain an 'algorithm' field
+    or an 'algorithms' array applied to every item. Every item is validated and hashed independently, so
+    an invalid item does not fail the rest of the batch.
+
+    Returns:
+        flask.Response: A JSON response.
+            - On success (HTTP 200): Contains 'results', a list in input order where
+              each entry has the item 'index' and either its 'hashed_value' (or
+              'hashed_values' when 'algorithms' was given) or an 'error' message,
+              plus 'algorithm' (or 'algorithms'), 'count' and 'error_count'.
+            - On client error (HTTP 400): Contains an 'error' message if the request
+              itself is unusable (wrong content type, malformed JSON, missing or
+              non-array 'texts' field, too many items, or unsupported algorithm).
+    """
+    if not request.is_json:
+        return error_response("Request content type must be application/json", 'content_type')
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict): # Also rejects a bare JSON array in place of an object
+        return error_response("Invalid or missing JSON data in request body", 'invalid_json')
+
+    texts = data.get('texts')
+
+    if texts is None:
+        return error_response("Missing 'texts' field in JSON data", 'missing_texts')
+
+    if not isinstance(texts, list):
+        return error_response("'texts' field must be an array", 'invalid_texts')
+
+    max_items = app.config['MAX_BATCH_ITEMS']
+    if len(texts) > max_items:
+        return error_response(f"'texts' field cannot contain more than {max_items} items", 'too_many_items')
+
+    algorithms, multiple, algorithm_error = select_algorithms(data)
+    if algorithm_error is not None:
+        return error_response(algorithm_error, 'invalid_algorithm')
+
+    results = [None] * len(texts)
+    valid_indexes = []
+    for index, text_to_hash in enumerate(texts):
+        validation_error = validate_text_value(text_to_hash, "Item")
+        if validation_error is None:
+            valid_indexes.append(index)
+        else:
+            results[index] = {"index": index, "error": validation_error}
+
+    # Large batches are spread across the hashing executor's workers.
+    valid_texts = [texts[index] for index in valid_indexes]
+    hashed_values = get_hash_executor().map_items(
+        functools.partial(calculate_selected_hashes, algorithms=algorithms, multiple=multiple),
+        valid_texts,
+        [len(text_to_hash) for text_to_hash in valid_texts])
+    count_hashed_texts(valid_texts, algorithms)
+
+    value_field = "hashed_values" if multiple else "hashed_value"
+    for index, hashed_value in zip(valid_indexes, hashed_values):
+        results[index] = {"index": index, value_field: hashed_value}
+    error_count = len(texts) - len(valid_indexes)
+
+    selection = {"algorithms": algorithms} if multiple else {"algorithm": algorithms[0]}
+    return jsonify({
+        "results": results,
+        **selection,
+        "count": len(results),
+        "error_count": error_count
+    }), 200
+
+@app.route('/api/verify', methods=['POST'])
+def api_verify():
+    """
+    Checks many (text, expected digest) pairs and reports only the ones that fail.
+
+    The endpoint expects a JSON payload with an 'items' array of objects, each
+    with 'text', 'expected' (hexadecimal digest), and optionally 'algorithm' and
+    an 'id' that is echoed back. A top-level 'algorithm' sets the default.
+    Digests are compared with hmac.compare_digest, and large batches are spread
+    across the hashing executor like /api/hash/batch.
+
+    Returns:
+        flask.Response: A JSON response.
+            - On success (HTTP 200): Contains 'mismatches' (objects with 'index', the
+              item's 'id' if given, and 'algorithm', 'expected' and 'actual'), 'errors'
+              (objects with 'index' and 'error'), 'count', 'match_count',
+              'mismatch_count' and 'error_count'.
+            - On client error (HTTP 400): Contains an 'error' message for a wrong content
+              type, malformed JSON, a missing or non-array 'items' field, too many items,
+              or an unsupported default algorithm.
+    """
+    if not request.is_json:
+        return error_response("Request content type must be application/json", 'content_type')
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return error_response("Invalid or missing JSON data in request body", 'invalid_json')
+
+    items = data.get('items')
+    if items is None:
+        return error_response("Missing 'items' field in JSON data", 'missing_items')
+    if not isinstance(items, list):
+        return error_response("'items' field must be an array", 'invalid_items')
+
+    max_items = app.config['MAX_BATCH_ITEMS']
+    if len(items) > max_items:
+        return error_response(f"'items' field cannot contain more than {max_items} items", 'too_many_items')
+
+    default_algorithm = data.get('algorithm', DEFAULT_ALGORITHM)
+    algorithm_error = validate_algorithm_value(default_algorithm)
+    if algorithm_error is not None:
+        return error_response(algorithm_error, 'invalid_algorithm')
+
+    outcomes = get_hash_executor().map_items(
+        functools.partial(verify_digest, default_algorithm=default_algorithm.lower()),
+        items,
+        [len(item['text']) if isinstance(item, dict) and isinstance(item.get('text'), str) else 0 for item in items])
+    count_verified_texts(items, outcomes, default_algorithm.lower())
+
+    mismatches = []
+    errors = []
+    for index, (outcome, details) in enumerate(outcomes):
+        if outcome == 'mismatch':
+            mismatches.append({"index": index, **details})
+        elif outcome == 'error':
+            errors.append({"index": index, **details})
+
+    return jsonify({
+        "mismatches": mismatches,
+        "errors": errors,
+        "count": len(items),
+        "match_count": len(items) - len(mismatches) - len(errors),
+        "mismatch_count": len(mismatches),
+        "error_count": len(errors)
+    }), 200
+
+@app.route('/api/verify/stream', methods=['POST'])
+def api_verify_stream():
+    """
+    Verifies a newline-delimited JSON (NDJSON) upload of digest pairs as it is received.
+
+    Each line is an object like the items of /api/verify. Lines are read and
+    checked one at a time, and only mismatches and errors are written back, so
+    memory use stays flat for runs of any size. The 'algorithm' query
+    parameter sets the default algorithm.
+
+    Returns:
+        flask.Response: A streamed 'application/x-ndjson' response.
+            - On success (HTTP 200): One JSON object per failing line with the input
+              'line' number and either 'algorithm', 'expected' and 'actual', or an
+              'error' message (plus the line's 'id' if given), followed by a final
+              'summary' object with 'count', 'match_count', 'mismatch_count' and
+              'error_count'.
+            - On client error (HTTP 400): A JSON 'error' message if the request content
+              type is not NDJSON or the 'algorithm' parameter is unsupported.
+    """
+    if request.mimetype not in NDJSON_MIMETYPES:
+        return error_response("Request content type must be application/x-ndjson", 'content_type')
+
+    default_algorithm = request.args.get('algorithm', DEFAULT_ALGORITHM)
+    algorithm_error = validate_algorithm_value(default_algorithm)
+    if algorithm_error is not None:
+        return error_response(algorithm_error, 'invalid_algorithm')
+    default_algorithm = default_algorithm.lower()
+
+    stream = request.stream
+    max_line_bytes = app.config['MAX_NDJSON_LINE_BYTES']
+
+    def generate():
+        counts = {'match': 0, 'mismatch': 0, 'error': 0}
+        for line_number, line in iter_ndjson_lines(stream, max_line_bytes):
+            if line is None:
+                outcome, details = 'error', {"error": f"Line exceeds the maximum length of {max_line_bytes} bytes"}
+            else:
+                try:
+                    item = app.json.loads(line)
+                except ValueError:
+                    outcome, details = 'error', {"error": "Invalid JSON object on this line"}
+                else:
+                    outcome, details = verify_digest(item, default_algorithm)
+                    count_verified_texts([item], [(outcome, details)], default_algorithm)
+            counts[outcome] += 1
+            if outcome != 'match':
+                yield app.json.dumps_bytes({"line": line_number, **details}) + b'\n'
+
+        yield app.json.dumps_bytes({"summary": {
+            "count": sum(counts.values()),
+            "match_count": counts['match'],
+            "mismatch_count": counts['mismatch'],
+            "error_count": counts['error']
+        }}) + b'\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/known', methods=['POST'])
+def api_known():
+    """
+    Checks many hexadecimal digests against the known-digest index.
+
+    The endpoint expects a JSON payload with a 'digests' array of hexadecimal
+    digests computed with the index's algorithm (DIGEST_INDEX_ALGORITHM).
+
+    Returns:
+        flask.Response: A JSON response.
+            - On success (HTTP 200): Contains 'known' (true or false per digest, in
+              request order, or null for an invalid digest), 'errors' (objects with
+              'index' and 'error'), 'algorithm', 'count' and 'known_count'.
+            - On client error (HTTP 400): Contains an 'error' message for a wrong content
+              type, malformed JSON, a missing or non-array 'digests' field, too many
+              digests, or no index configured.
+    """
+    if not request.is_json:
+        return error_response("Request content type must be application/json", 'content_type')
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return error_response("Invalid or missing JSON data in request body", 'invalid_json')
+
+    digests = data.get('digests')
+    if digests is None:
+        return error_response("Missing 'digests' field in JSON data", 'missing_digests')
+    if not isinstance(digests, list):
+        return error_response("'digests' field must be an array", 'invalid_digests')
+
+    max_items = app.config['MAX_KNOWN_LOOKUP_ITEMS']
+    if len(digests) > max_items:
+        return error_response(f"'digests' field cannot contain more than {max_items} items", 'too_many_items')
+
+    digest_index = get_digest_index()
+    if digest_index is None:
+        return error_response("No known-digest index is configured on this server", 'index_unavailable')
+
+    stage_started = time.perf_counter()
+    hex_length = digest_index.digest_size * 2
+    known = []
+    errors = []
+    for index, digest in enumerate(digests):
+        if not isinstance(digest, str) or len(digest) != hex_length:
+            known.append(None)
+            errors.append({"index": index, "error": f"Digest must be a {hex_length}-character hexadecimal string"})
+            continue
+        try:
+            raw_digest = bytes.fromhex(digest)
+        except ValueError:
+            known.append(None)
+            errors.append({"index": index, "error": "Digest must be a hexadecimal string"})
+            continue
+        known.append(raw_digest in digest_index)
+    observe_stage('lookup', stage_started)
+
+    return jsonify({
+        "known": known,
+        "errors": errors,
+        "algorithm": app.config['DIGEST_INDEX_ALGORITHM'],
+        "count": len(digests),
+        "known_count": sum(1 for result in known if result)
+    }), 200
+
+@app.route('/api/hash/stream', methods=['POST'])
+def api_hash_stream():
+    """
+    Hashes a newline-delimited JSON (NDJSON) upload as it is received.
+
+    Each line of the request body must be a JSON object with a 'text' field,
+    just like the payload of /api/hash. Lines are read from the request stream
+    and answered one by one, so memory use stays flat regardless of upload size.
+    The 'algorithm' query parameter (or a comma-separated 'algorithms' parameter)
+    sets the default for every line, and a line may override it with its own
+    'algorithm' or 'algorithms' field.
+
+    Returns:
+        flask.Response: A streamed 'application/x-ndjson' response.
+            - On success (HTTP 200): One JSON object per non-blank input line,
+              containing the input 'line' number and either its 'hashed_value'
+              (or 'hashed_values' for several algorithms) or an 'error' message.
+            - On client error (HTTP 400): A JSON 'error' message if the request
+              content type is not NDJSON or the 'algorithm' parameter is unsupported.
+    """
+    if request.mimetype not in NDJSON_MIMETYPES:
+        return error_response("Request content type must be application/x-ndjson", 'content_type')
+
+    default_algorithms, default_multiple, algorithm_error = select_algorithms(get_query_algorithm_options())
+    if algorithm_error is not None:
+        return error_response(algorithm_error, 'invalid_algorithm')
+
+    stream = request.stream
+    max_line_bytes = app.config['MAX_NDJSON_LINE_BYTES']
+
+    def generate():
+        for line_number, line in iter_ndjson_lines(stream, max_line_bytes):
+            if line is None:
+                result = {"line": line_number, "error": f"Line exceeds the maximum length of {max_line_bytes} bytes"}
+                yield app.json.dumps_bytes(result) + b'\n'
+                continue
+
+            try:
+                data = app.json.loads(line)
+            except ValueError:
+                data = None
+
+            if not isinstance(data, dict):
+                result = {"line": line_number, "error": "Invalid JSON object on this line"}
+            elif data.get('text') is None:
+                result = {"line": line_number, "error": "Missing 'text' field in JSON data"}
+            else:
+                text_to_hash = data['text']
+                if data.get('algorithm') is not None or data.get('algorithms') is not None:
+                    algorithms, multiple, algorithm_error = select_algorithms(data)
+                else:
+                    algorithms, multiple, algorithm_error = default_algorithms, default_multiple, None
+                validation_error = validate_text_value(text_to_hash) or algorithm_error
+                if validation_error is not None:
+                    result = {"line": line_number, "error": validation_error}
+                else:
+                    value_field = "hashed_values" if multiple else "hashed_value"
+                    result = {"line": line_number, value_field: calculate_selected_hashes(text_to_hash, algorithms, multiple)}
+                    count_hashed_texts([text_to_hash], algorithms)
+
+            yield app.json.dumps_bytes(result) + b'\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/hash/upload', methods=['POST'])
+def api_hash_upload():
+    """
+    Hashes one or more files uploaded as multipart/form-data.
+
+    Each file part is hashed chunk by chunk while the body is parsed, so files
+    are never held whole in memory or written to temporary files. The
+    algorithm is selected by the 'algorithm' or comma-separated 'algorithms'
+    query parameter, or else by form fields of the same names sent before the
+    files.
+
+    Returns:
+        flask.Response: A JSON response.
+            - On success (HTTP 200): Contains 'files', a list with one object per uploaded
+              file ('field', 'filename', 'byte_count', and 'hashed_value' and 'algorithm'
+              or 'hashed_values'), and 'count'.
+            - On client error (HTTP 400): Contains an 'error' message if the content type
+              is not multipart/form-data, the body is malformed or contains no files,
+              a limit is exceeded, or the algorithm is unsupported.
+    """
+    files, fields, upload_error = hash_request_uploads(get_query_algorithm_options())
+    if upload_error is not None:
+        return error_response(upload_error, 'invalid_upload')
+    if not files:
+        return error_response("No files found in multipart/form-data body", 'missing_files')
+
+    return jsonify({
+        "files": files,
+        "count": len(files)
+    }), 200
+
+@app.route('/api/hash/local', methods=['POST'])
+def api_hash_local():
+    """
+    Hashes a file or directory on the server's own filesystem.
+
+    The endpoint is disabled unless app.config['LOCAL_HASH_ROOTS'] lists the
+    directories that may be read. It expects a JSON payload with a 'path' field
+    holding an absolute path inside one of them, and accepts the same
+    'algorithm' and 'algorithms' fields as /api/hash. Files are read through
+    a memory map. Directories are walked concurrently, their files hashed on
+    the shared hashing executor, and the per-file manifest is combined into a
+    tree digest (see local_files.tree_digest).
+
+    Returns:
+        flask.Response: A JSON response.
+            - On success (HTTP 200): Contains 'path', 'type' ('file' or 'directory'),
+              'byte_count', and 'hashed_value' and 'algorithm' or 'hashed_values'.
+              For a directory the hash is the tree digest, and the response also
+              contains 'files' (one object per file with its relative 'path',
+              'byte_count' and hash, or an 'error'), 'file_count' and 'error_count'.
+            - On client error (HTTP 400): Contains an 'error' message for a wrong content
+              type, malformed JSON, a missing or relative 'path' or one containing NUL
+              characters, an unsupported algorithm, or a directory with more than
+              LOCAL_HASH_MAX_FILES files.
+            - HTTP 403 if local hashing is disabled or the path is outside the allowed
+              directories, HTTP 404 if the path does not exist or is not a regular
+              file or directory, and HTTP 500 if the file exists but cannot be read.
+    """
+    if not request.is_json:
+        return error_response("Request content type must be application/json", 'content_type')
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict): # Also rejects a bare JSON array, string or number
+        return error_response("Invalid or missing JSON data in request body", 'invalid_json')
+
+    path = data.get('path')
+    if path is None:
+        return error_response("Missing 'path' field in JSON data", 'missing_path')
+    if not isinstance(path, str) or not os.path.isabs(path):
+        return error_response("'path' field must be an absolute path", 'invalid_path')
+    if '\x00' in path: # os.path.realpath and open() raise ValueError on NUL bytes
+        return error_response("'path' field must not contain NUL characters", 'invalid_path')
+
+    algorithms, multiple, algorithm_error = select_algorithms(data)
+    if algorithm_error is not None:
+        return error_response(algorithm_error, 'invalid_algorithm')
+
+    roots = app.config['LOCAL_HASH_ROOTS']
+    if not roots:
+        return error_response("Local path hashing is disabled", 'local_disabled', 403)
+    resolved_path = is_within_roots(path, roots)
+    if resolved_path is None:
+        return error_response("Path is outside the allowed directories", 'path_not_allowed', 403)
+
+    chunk_size = app.config['HASH_CHUNK_SIZE']
+    if os.path.isfile(resolved_path):
+        try:
+            hashed_values, byte_count = hash_file(resolved_path, algorithms, new_hasher, chunk_size)
+        except FileNotFoundError: # Removed after the check above
+            return error_response("Path not found or not a regular file or directory", 'path_not_found', 404)
+        except OSError as error:
+            return error_response(f"Could not read file: {error.strerror or error}", 'unreadable_path', 500)
+        for algorithm in algorithms:
+            BYTES_HASHED.inc(byte_count, algorithm=algorithm)
+        result = {"path": path, "type": "file", "byte_count": byte_count}
+    elif os.path.isdir(resolved_path):
+        max_files = app.config['LOCAL_HASH_MAX_FILES']
+        entries = walk_tree(resolved_path, app.config['HASH_EXECUTOR_WORKERS'], max_files)
+        if entries is None:
+            return error_response(f"Directory contains more than {max_files} files", 'too_many_files')
+
+        hash_entry = functools.partial(hash_manifest_entry, algorithms=algorithms, new_hasher=new_hasher,
+                                       chunk_size=chunk_size)
+        hashed_entries = get_hash_executor().map_items(hash_entry, entries, [entry[2] for entry in entries])
+
+        files = []
+        manifest = []
+        for (relative_path, _, _), (file_hashed_values, file_byte_count, file_error) in zip(entries, hashed_entries):
+            if file_error is not None:
+                files.append({"path": relative_path, "error": file_error})
+            elif multiple:
+                files.append({"path": relative_path, "byte_count": file_byte_count, "hashed_values": file_hashed_values})
+            else:
+                files.append({"path": relative_path, "byte_count": file_byte_count,
+                              "hashed_value": file_hashed_values[algorithms[0]]})
+            if file_error is None:
+                manifest.append((relative_path, file_hashed_values))
+        byte_count = sum(file.get('byte_count', 0) for file in files)
+        for algorithm in algorithms:
+            BYTES_HASHED.inc(byte_count, algorithm=algorithm)
+
+        hashed_values = {algorithm: tree_digest(manifest, algorithm, new_hasher) for algorithm in algorithms}
+        result = {
+            "path": path,
+            "type": "directory",
+            "byte_count": byte_count,
+            "file_count": len(manifest),
+            "error_count": len(files) - len(manifest),
+            "files": files
+        }
+    else:
+        return error_response("Path not found or not a regular file or directory", 'path_not_found', 404)
+
+    if multiple:
+        result["hashed_values"] = hashed_values
+    else:
+        result["hashed_value"] = hashed_values[algorithms[0]]
+        result["algorithm"] = algorithms[0]
+    return jsonify(result), 200
+
+@app.route('/api/hash/merkle', methods=['POST'])
+def api_hash_merkle():
+    """
+    Calculates a Merkle tree hash of a raw binary request body.
+
+    The endpoint expects a POST request whose 'Content-Type' header is
+    'application/octet-stream'. The body is read in groups of leaves that are
+    hashed in parallel as it arrives (see calculate_stream_merkle_tree). The
+    optional 'algorithm' query parameter selects the algorithm and 'leaf_size'
+    the leaf size in bytes (default app.config['MERKLE_LEAF_SIZE']).
+
+    Returns:
+        flask.Response: A JSON response.
+            - On success (HTTP 200): Contains 'hashed_value' (the root), 'algorithm',
+              'leaf_size', 'byte_count', 'leaf_count' and 'leaves' (the leaf digests in order).
+            - On client error (HTTP 400): Contains an 'error' message if the content type
+              is not application/octet-stream, the algorithm is unsupported or several
+              were requested, or 'leaf_size' is not an integer within MERKLE_LEAF_SIZE_LIMITS.
+    """
+    if request.mimetype != 'application/octet-stream':
+        return error_response("Request content type must be application/octet-stream", 'content_type')
+
+    algorithms, multiple, algorithm_error = select_algorithms(get_query_algorithm_options())
+    if algorithm_error is not None:
+        return error_response(algorithm_error, 'invalid_algorithm')
+    if multiple:
+        return error_response("Merkle tree hashing supports a single 'algorithm' only", 'invalid_algorithm')
+
+    min_leaf_size, max_leaf_size = MERKLE_LEAF_SIZE_LIMITS
+    leaf_size = request.args.get('leaf_size', str(app.config['MERKLE_LEAF_SIZE']))
+    leaf_size = int(leaf_size) if leaf_size.isdigit() else None
+    if leaf_size is None or not min_leaf_size <= leaf_size <= max_leaf_size:
+        return error_response(f"'leaf_size' must be an integer between {min_leaf_size} and {max_leaf_size}",
+                              'invalid_leaf_size')
+
+    root, leaves, byte_count = calculate_stream_merkle_tree(request.stream, leaf_size, algorithms[0])
+    return jsonify({
+        "hashed_value": root,
+        "algorithm": algorithms[0],
+        "leaf_size": leaf_size,
+        "byte_count": byte_count,
+        "leaf_count": len(leaves),
+        "leaves": leaves
+    }), 200
+
+def upload_session_state(session):
+    """Describes an upload session in API responses."""
+    selection = {"algorithms": session.algorithms} if session.multiple else {"algorithm": session.algorithms[0]}
+    return {"session_id": session.session_id, "offset": session.offset, **selection}
+
+@app.route('/api/hash/sessions', methods=['POST'])
+def api_hash_session_create():
+    """
+    Opens a resumable upload session.
+
+    The JSON body may contain an 'algorithm' or 'algorithms' field as for
+    /api/hash (an empty body selects the default algorithm). Data is then
+    appended with PATCH /api/hash/sessions/<session_id>?offset=N in any number
+    of requests, and POST /api/hash/sessions/<session_id>/finalize returns the
+    hash. The running hasher state is kept in memory between requests, so an
+    interrupted upload resumes from the last received byte.
+
+    Returns:
+        flask.Response: A JSON response.
+            - On success (HTTP 201): Contains 'session_id', 'offset' (0), and
+              'algorithm' or 'algorithms'.
+            - On client error (HTTP 400): Contains an 'error' message for malformed
+              JSON or an unsupported algorithm.
+            - HTTP 503 if UPLOAD_SESSION_MAX sessions are already open.
+    """
+    data = {}
+    if request.content_length or request.is_json:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return error_response("Invalid or missing JSON data in request body", 'invalid_json')
+
+    algorithms, multiple, algorithm_error = select_algorithms(data)
+    if algorithm_error is not None:
+        return error_response(algorithm_error, 'invalid_algorithm')
+
+    session = get_upload_sessions().create(
+        algorithms, multiple, {algorithm: new_hasher(algorithm) for algorithm in algorithms})
+    if session is None:
+        return error_response("Too many open upload sessions", 'too_many_sessions', 503)
+    return jsonify(upload_session_state(session)), 201
+
+@app.route('/api/hash/sessions/<session_id>', methods=['GET'])
+def api_hash_session_status(session_id):
+    """
+    Reports how many bytes an upload session has received.
+
+    Clients call this after a disconnect to learn the offset to resume from.
+
+    Returns:
+        flask.Response: A JSON response with 'session_id', 'offset', and 'algorithm'
+            or 'algorithms' (HTTP 200), or an 'error' (HTTP 404) for an unknown or
+            expired session.
+    """
+    session = get_upload_sessions().get(session_id)
+    if session is None:
+        return error_response("Upload session not found or expired", 'session_not_found', 404)
+    return jsonify(upload_session_state(session)), 200
+
+@app.route('/api/hash/sessions/<session_id>', methods=['PATCH'])
+def api_hash_session_append(session_id):
+    """
+    Appends the request body to an upload session.
+
+    The endpoint expects an 'application/octet-stream' body and an 'offset'
+    query parameter equal to the session's current offset, which protects
+    against sending a chunk twice or skipping one. The body is hashed chunk by
+    chunk as it arrives. If the client disconnects part way, the bytes received
+    until then are kept and the session offset tells the client where to resume.
+
+    Returns:
+        flask.Response: A JSON response.
+            - On success (HTTP 200): Contains 'session_id', the new 'offset', and
+              'algorithm' or 'algorithms'.
+            - On client error (HTTP 400): Contains an 'error' message for a wrong
+              content type or a missing or non-integer 'offset'.
+            - HTTP 404 for an unknown or expired session, and HTTP 409 if 'offset'
+              does not match (the response's 'offset' is the expected one) or another
+              request is appending to the same session.
+    """
+    if request.mimetype != 'application/octet-stream':
+        return error_response("Request content type must be application/octet-stream", 'content_type')
+
+    offset = request.args.get('offset', '')
+    if not offset.isdigit():
+        return error_response("'offset' query parameter must be a non-negative integer", 'invalid_offset')
+
+    sessions = get_upload_sessions()
+    session = sessions.get(session_id)
+    if session is None:
+        return error_response("Upload session not found or expired", 'session_not_found', 404)
+
+    if not session.lock.acquire(blocking=False):
+        return error_response("Another request is appending to this upload session", 'session_busy', 409)
+    try:
+        if not sessions.is_registered(session): # Finalized or deleted since the lookup above
+            return error_response("Upload session not found or expired", 'session_not_found', 404)
+        if int(offset) != session.offset:
+            return error_response(f"Offset mismatch: the session expects offset {session.offset}",
+                                  'offset_mismatch', 409, offset=session.offset)
+        chunk_size = app.config['HASH_CHUNK_SIZE']
+        started_at = session.offset
+        try:
+            while True:
+                chunk = request.stream.read(chunk_size)
+                if not chunk:
+                    break
+                session.update(chunk)
+        except ClientDisconnected:
+            # The bytes hashed so far are kept; the client resumes from session.offset.
+            return error_response("Upload interrupted before the end of the body", 'client_disconnected', 400,
+                                  offset=session.offset)
+        finally:
+            for algorithm in session.algorithms:
+                BYTES_HASHED.inc(session.offset - started_at, algorithm=algorithm)
+        return jsonify(upload_session_state(session)), 200
+    finally:
+        session.lock.release()
+
+@app.route('/api/hash/sessions/<session_id>/finalize', methods=['POST'])
+def api_hash_session_finalize(session_id):
+    """
+    Closes an upload session and returns the hash of everything appended to it.
+
+    Returns:
+        flask.Response: A JSON response.
+            - On success (HTTP 200): Contains 'hashed_value' and 'algorithm', or
+              'hashed_values', and 'byte_count'.
+            - HTTP 404 for an unknown or expired session, and HTTP 409 if a request
+              is still appending to it.
+    """
+    sessions = get_upload_sessions()
+    session = sessions.get(session_id)
+    if session is None:
+        return error_response("Upload session not found or expired", 'session_not_found', 404)
+    if not session.lock.acquire(blocking=False):
+        return error_response("Another request is appending to this upload session", 'session_busy', 409)
+    try:
+        if sessions.remove(session_id) is not session: # Finalized or deleted since the lookup above
+            return error_response("Upload session not found or expired", 'session_not_found', 404)
+        hashed_values = session.hexdigests()
+    finally:
+        session.lock.release()
+
+    if session.multiple:
+        return jsonify({
+            "hashed_values": hashed_values,
+            "byte_count": session.offset
+        }), 200
+
+    return jsonify({
+        "hashed_value": hashed_values[session.algorithms[0]],
+        "algorithm": session.algorithms[0],
+        "byte_count": session.offset
+    }), 200
+
+@app.route('/api/hash/sessions/<session_id>', methods=['DELETE'])
+def api_hash_session_delete(session_id):
+    """
+    Abandons an upload session.
+
+    An append in progress is allowed to finish first, so it never reports
+    success for bytes hashed into a removed session.
+
+    Returns:
+        flask.Response: An empty response (HTTP 204), or an 'error' (HTTP 404)
+            for an unknown session.
+    """
+    sessions = get_upload_sessions()
+    session = sessions.get(session_id)
+    if session is None:
+        return error_response("Upload session not found or expired", 'session_not_found', 404)
+    with session.lock:
+        if sessions.remove(session_id) is not session:
+            return error_response("Upload session not found or expired", 'session_not_found', 404)
+    return Response(status=204)
+
+@app.route('/api/sign', methods=['POST'])
+def api_sign():
+    """
+    Signs one or many strings with a server-held key (HMAC or keyed BLAKE2).
+
+    The endpoint expects a JSON payload with a 'key_id' naming a key from
+    app.config['SIGNING_KEYS'], and either a 'text' string or a 'texts' array
+    of strings to sign in one request. 'mode' selects 'hmac' (default, with
+    'algorithm' as the digest, 'sha256' by default) or 'blake2' (keyed
+    'blake2b' or 'blake2s'). Key setup is done once per key and reused, see
+    SigningKeyring.
+
+    Returns:
+        flask.Response: A JSON response.
+            - On success (HTTP 200): Contains 'signature' (hex) for 'text', or 'results'
+              (one object per item with 'index' and 'signature' or 'error'), 'count' and
+              'error_count' for 'texts'; plus 'key_id', 'mode' and 'algorithm'.
+            - On client error (HTTP 400): Contains an 'error' message for a wrong content
+              type, malformed JSON, an unknown key, an unsupported mode or algorithm, a
+              missing or invalid 'text'/'texts' field, or too many items.
+    """
+    if not request.is_json:
+        return error_response("Request content type must be application/json", 'content_type')
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict): # Also rejects a bare JSON array, string or number
+        return error_response("Invalid or missing JSON data in request body", 'invalid_json')
+
+    key_id, mode, algorithm, signing_error = select_signing_options(data)
+    if signing_error is not None:
+        return error_response(signing_error, 'invalid_signing_options')
+    options = {"key_id": key_id, "mode": mode, "algorithm": algorithm}
+    keyring = get_signing_keyring()
+
+    texts = data.get('texts')
+    if texts is None:
+        text_to_sign = data.get('text')
+        if text_to_sign is None:
+            return error_response("Missing 'text' or 'texts' field in JSON data", 'missing_text')
+        if not isinstance(text_to_sign, str):
+            return error_response("'text' field must be a string", 'invalid_text')
+        return jsonify({
+            "signature": keyring.sign(key_id, mode, algorithm, text_to_sign.encode('utf-8')),
+            **options
+        }), 200
+
+    if not isinstance(texts, list):
+        return error_response("'texts' field must be an array", 'invalid_texts')
+    max_items = app.config['MAX_BATCH_ITEMS']
+    if len(texts) > max_items:
+        return error_response(f"'texts' field cannot contain more than {max_items} items", 'too_many_items')
+
+    results = []
+    for index, text_to_sign in enumerate(texts):
+        if isinstance(text_to_sign, str):
+            results.append({"index": index, "signature": keyring.sign(key_id, mode, algorithm, text_to_sign.encode('utf-8'))})
+        else:
+            results.append({"index": index, "error": "Item must be a string"})
+    return jsonify({
+        "results": results,
+        **options,
+        "count": len(results),
+        "error_count": sum(1 for result in results if "error" in result)
+    }), 200
+
+@app.route('/api/hash/raw', methods=['POST'])
+def api_hash_raw():
+    """
+    Hashes a raw binary request body without buffering it.
+
+    The endpoint expects a POST request whose 'Content-Type' header is
+    'application/octet-stream'. The body may be sent with a Content-Length or
+    with chunked transfer encoding, and is hashed chunk by chunk as it arrives.
+    The optional 'algorithm' query parameter selects the algorithm, and a
+    comma-separated 'algorithms' parameter computes several hashes while
+    reading the body only once.
+
+    Returns:
+        flask.Response: A JSON response.
+            - On success (HTTP 200): Contains 'hashed_value', 'algorithm' and 'byte_count',
+              or 'hashed_values' and 'byte_count' if 'algorithms' was given.
+            - On client error (HTTP 400): Contains an 'error' message if the content
+              type is not application/octet-stream or the algorithm is unsupported.
+    """
+    if request.mimetype != 'application/octet-stream':
+        return error_response("Request content type must be application/octet-stream", 'content_type')
+
+    algorithms, multiple, algorithm_error = select_algorithms(get_query_algorithm_options())
+    if algorithm_error is not None:
+        return error_response(algorithm_error, 'invalid_algorithm')
+
+    hashed_values, byte_count = calculate_stream_hashes(request.stream, app.config['HASH_CHUNK_SIZE'], algorithms)
+
+    if multiple:
+        return jsonify({
+            "hashed_values": hashed_values,
+            "byte_count": byte_count
+        }), 200
+
+    return jsonify({
+        "hashed_value": hashed_values[algorithms[0]],
+        "algorithm": algorithms[0],
+        "byte_count": byte_count
+    }), 200
+
+@app.route('/api/algorithms', methods=['GET'])
+def api_algorithms():
+    """
+    Lists the supported hash algorithms together with their measured throughput.
+
+    Throughput is measured on this machine the first time an algorithm is listed
+    and cached for the lifetime of the process, so callers can pick the fastest
+    algorithm that meets their needs.
+
+    Returns:
+        flask.Response: A JSON response (HTTP 200) containing 'default', the default
+            algorithm name, and 'algorithms', a list of objects with 'name', 'backend',
+            'digest_size' (bytes) and 'throughput_mb_per_s'.
+    """
+    algorithms = []
+    for name in sorted(HASH_ALGORITHMS):
+        info = HASH_ALGORITHMS[name]
+        algorithms.append({
+            "name": name,
+            "backend": info['backend'],
+            "digest_size": info['digest_size'],
+            "throughput_mb_per_s": measure_algorithm_throughput(name)
+        })
 
     return jsonify({
-        "original_text": text_to_hash,
-        "hashed_value": hashed_value
+        "default": DEFAULT_ALGORITHM,
+        "algorithms": algorithms
     }), 200
 
+@app.route('/api/cache/stats', methods=['GET'])
+def api_cache_stats():
+    """
+    Reports the digest cache counters.
+
+    Returns:
+        flask.Response: A JSON response (HTTP 200) containing 'enabled' and, when the
+            cache is enabled, its hit/miss/eviction counters and current occupancy.
+    """
+    digest_cache = get_digest_cache()
+    if digest_cache is None:
+        return jsonify({"enabled": False}), 200
+
+    return jsonify({"enabled": True, **digest_cache.stats()}), 200
+
+@app.route('/metrics', methods=['GET'])
+def metrics_page():
+    """
+    Exposes request, stage, payload, hashing and validation error metrics.
+
+    Returns:
+        flask.Response: The metrics in the Prometheus text exposition format (HTTP 200),
+            or HTTP 404 if METRICS_ENABLED is off.
+    """
+    if not app.config['METRICS_ENABLED']:
+        return Response("Metrics are disabled\n", status=404, mimetype='text/plain')
+    return Response(metrics_registry.render(), content_type=METRICS_CONTENT_TYPE)
+
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    # Development server only; debug mode is off unless FLASK_DEBUG=1 is set.
+    # Use serve.py to run under a production server.
+    app.run()
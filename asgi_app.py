@@ -0,0 +1,254 @@
+"""
+Asyncio-native (ASGI) variant of the API-Hasher hashing API.
+
+Serves the same /api/hash, /api/hash/batch and /api/algorithms routes as the
+Flask app in app.py, with the same payloads and error messages, and shares its
+hashing core and /api/hash response formats (JSON, MessagePack or raw digest,
+negotiated from the Accept header). A single event loop handles many mostly idle keep-alive clients
+without a thread per connection. Inputs of ASGI_INLINE_THRESHOLD characters or
+more are hashed in a thread pool, so small requests never wait behind a large one.
+
+It is a plain ASGI callable with no framework dependency. Run it next to the
+Flask app for comparison, for example with uvicorn:
+
+    python serve.py --server uvicorn --port 5001
+"""
+import asyncio
+import functools
+import json
+
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+
+from app import (DEFAULT_ALGORITHM, HASH_ALGORITHMS, app as flask_app, build_hash_response,
+                 calculate_selected_hashes, count_hashed_texts, get_hash_executor, is_known_digest,
+                 measure_algorithm_throughput, negotiate_hash_mimetype, select_algorithms, select_known_check,
+                 validate_text_value)
+
+# Inputs with at least this many characters are hashed off the event loop.
+ASGI_INLINE_THRESHOLD = 64 * 1024
+
+
+async def read_body(receive):
+    """Collects the full request body from the ASGI receive channel."""
+    chunks = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        chunks.append(message.get('body', b''))
+        more_body = message.get('more_body', False)
+    return b''.join(chunks)
+
+
+async def send_json(send, payload, status=200):
+    """Sends a complete JSON response."""
+    body = (flask_app.json.dumps(payload) + '\n').encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode('ascii')),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def send_response(send, response):
+    """Sends a complete flask.Response, such as one built by app.build_hash_response."""
+    body = response.get_data()
+    headers = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in response.headers.items()
+               if name.lower() != 'content-length']
+    headers.append((b'content-length', str(len(body)).encode('ascii')))
+    await send({'type': 'http.response.start', 'status': response.status_code, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def header_value(scope, name):
+    """Returns the first value of a request header (name in lowercase bytes), or None."""
+    for header_name, value in scope['headers']:
+        if header_name == name:
+            return value
+    return None
+
+
+def is_json_request(scope):
+    """Mirrors flask.Request.is_json: application/json or any application/*+json type."""
+    value = header_value(scope, b'content-type')
+    if value is None:
+        return False
+    mimetype = value.split(b';', 1)[0].strip().lower()
+    return mimetype == b'application/json' or (mimetype.startswith(b'application/') and mimetype.endswith(b'+json'))
+
+
+async def read_json_object(scope, receive):
+    """
+    Reads and decodes the JSON request body.
+
+    Returns:
+        tuple: (data, error) where error is the same message app.py returns
+               for a wrong content type or missing/invalid JSON, or None.
+    """
+    if not is_json_request(scope):
+        return None, "Request content type must be application/json"
+    body = await read_body(receive)
+    try:
+        data = json.loads(body) if body else None
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        return None, "Invalid or missing JSON data in request body"
+    return data, None
+
+
+async def hash_off_loop_if_large(input_string, algorithms, multiple):
+    """Hashes small inputs inline and large ones in the loop's thread pool."""
+    if len(input_string) < ASGI_INLINE_THRESHOLD:
+        return calculate_selected_hashes(input_string, algorithms, multiple)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, calculate_selected_hashes, input_string, algorithms, multiple)
+
+
+async def api_hash(scope, receive, send):
+    """ASGI counterpart of app.api_hash."""
+    data, error = await read_json_object(scope, receive)
+    if error is not None:
+        return await send_json(send, {"error": error}, 400)
+
+    text_to_hash = data.get('text')
+    if text_to_hash is None:
+        return await send_json(send, {"error": "Missing 'text' field in JSON data"}, 400)
+
+    validation_error = validate_text_value(text_to_hash)
+    if validation_error is not None:
+        return await send_json(send, {"error": validation_error}, 400)
+
+    algorithms, multiple, algorithm_error = select_algorithms(data)
+    if algorithm_error is not None:
+        return await send_json(send, {"error": algorithm_error}, 400)
+
+    include_text = data.get('include_text', True)
+    if not isinstance(include_text, bool):
+        return await send_json(send, {"error": "'include_text' field must be a boolean"}, 400)
+
+    digest_index, known_error, _ = select_known_check(data, algorithms)
+    if known_error is not None:
+        return await send_json(send, {"error": known_error}, 400)
+
+    hashed = await hash_off_loop_if_large(text_to_hash, algorithms, multiple)
+    if hashed is None:
+        return await send_json(send, {"error": "Internal server error: Could not calculate hash"}, 500)
+    count_hashed_texts([text_to_hash], algorithms)
+
+    known = is_known_digest(digest_index, hashed, multiple) if digest_index is not None else None
+
+    accept = parse_accept_header((header_value(scope, b'accept') or b'').decode('latin-1'), MIMEAccept)
+    with flask_app.app_context(): # build_hash_response encodes JSON with the app's provider
+        response = build_hash_response(negotiate_hash_mimetype(accept), text_to_hash, algorithms, multiple,
+                                       hashed, include_text, known)
+    response.vary.add('Accept')
+    return await send_response(send, response)
+
+
+async def api_hash_batch(scope, receive, send):
+    """ASGI counterpart of app.api_hash_batch."""
+    data, error = await read_json_object(scope, receive)
+    if error is not None:
+        return await send_json(send, {"error": error}, 400)
+
+    texts = data.get('texts')
+    if texts is None:
+        return await send_json(send, {"error": "Missing 'texts' field in JSON data"}, 400)
+    if not isinstance(texts, list):
+        return await send_json(send, {"error": "'texts' field must be an array"}, 400)
+
+    max_items = flask_app.config['MAX_BATCH_ITEMS']
+    if len(texts) > max_items:
+        return await send_json(send, {"error": f"'texts' field cannot contain more than {max_items} items"}, 400)
+
+    algorithms, multiple, algorithm_error = select_algorithms(data)
+    if algorithm_error is not None:
+        return await send_json(send, {"error": algorithm_error}, 400)
+
+    results = [None] * len(texts)
+    valid_indexes = []
+    for index, text_to_hash in enumerate(texts):
+        validation_error = validate_text_value(text_to_hash, "Item")
+        if validation_error is None:
+            valid_indexes.append(index)
+        else:
+            results[index] = {"index": index, "error": validation_error}
+
+    hash_item = functools.partial(calculate_selected_hashes, algorithms=algorithms, multiple=multiple)
+    valid_texts = [texts[index] for index in valid_indexes]
+    sizes = [len(text_to_hash) for text_to_hash in valid_texts]
+    if sum(sizes) < ASGI_INLINE_THRESHOLD:
+        hashed_values = [hash_item(text_to_hash) for text_to_hash in valid_texts]
+    else:
+        # Large batches leave the loop and are spread over the shared hashing executor.
+        loop = asyncio.get_running_loop()
+        hashed_values = await loop.run_in_executor(None, get_hash_executor().map_items, hash_item, valid_texts, sizes)
+    count_hashed_texts(valid_texts, algorithms)
+
+    value_field = "hashed_values" if multiple else "hashed_value"
+    for index, hashed_value in zip(valid_indexes, hashed_values):
+        results[index] = {"index": index, value_field: hashed_value}
+
+    selection = {"algorithms": algorithms} if multiple else {"algorithm": algorithms[0]}
+    return await send_json(send, {
+        "results": results,
+        **selection,
+        "count": len(results),
+        "error_count": len(texts) - len(valid_indexes)
+    })
+
+
+async def api_algorithms(scope, receive, send):
+    """ASGI counterpart of app.api_algorithms."""
+    loop = asyncio.get_running_loop()
+    # The first call measures every algorithm, which would otherwise block the loop.
+    throughputs = await loop.run_in_executor(None, lambda: {name: measure_algorithm_throughput(name) for name in HASH_ALGORITHMS})
+    algorithms = []
+    for name in sorted(HASH_ALGORITHMS):
+        info = HASH_ALGORITHMS[name]
+        algorithms.append({
+            "name": name,
+            "backend": info['backend'],
+            "digest_size": info['digest_size'],
+            "throughput_mb_per_s": throughputs[name]
+        })
+    return await send_json(send, {"default": DEFAULT_ALGORITHM, "algorithms": algorithms})
+
+
+ROUTES = {
+    '/api/hash': ('POST', api_hash),
+    '/api/hash/batch': ('POST', api_hash_batch),
+    '/api/algorithms': ('GET', api_algorithms),
+}
+
+
+async def application(scope, receive, send):
+    """The ASGI entry point."""
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    if scope['type'] != 'http':
+        return
+
+    route = ROUTES.get(scope['path'])
+    if route is None:
+        return await send_json(send, {"error": "Not Found"}, 404)
+
+    method, handler = route
+    if scope['method'] != method:
+        return await send_json(send, {"error": "Method Not Allowed"}, 405)
+
+    await handler(scope, receive, send)
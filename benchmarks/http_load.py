@@ -0,0 +1,111 @@
+"""
+Minimal HTTP load generator for the API-Hasher API.
+
+Opens one keep-alive connection per client thread and sends POST requests to
+/api/hash for a fixed duration, then reports requests per second and latency
+percentiles. Uses only the standard library so it runs anywhere the app does.
+
+Example:
+    python benchmarks/http_load.py --url http://127.0.0.1:5000/api/hash --concurrency 16 --duration 10
+"""
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def percentile(sorted_values, fraction):
+    """Returns the value at the given fraction (0..1) of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def run_load(url, body, concurrency, duration, content_type='application/json'):
+    """
+    Sends requests from several client threads until the duration has elapsed.
+
+    Args:
+        url (str): The endpoint URL.
+        body (bytes): The request body sent with every request.
+        concurrency (int): Number of client threads (and connections).
+        duration (float): Seconds to keep sending requests.
+        content_type (str): The Content-Type header value.
+
+    Returns:
+        dict: Contains 'requests', 'errors', 'duration_s', 'requests_per_s'
+              and 'latency_ms' with 'p50', 'p90', 'p99' and 'max'.
+    """
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+    headers = {'Content-Type': content_type, 'Connection': 'keep-alive'}
+    deadline = time.perf_counter() + duration
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def client():
+        connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+        local_latencies = []
+        local_errors = 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                connection.request('POST', path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    local_errors += 1
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                connection.close()
+                connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+                continue
+            local_latencies.append(time.perf_counter() - start)
+        connection.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "duration_s": round(elapsed, 3),
+        "requests_per_s": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 3),
+            "p90": round(percentile(latencies, 0.90) * 1000, 3),
+            "p99": round(percentile(latencies, 0.99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3) if latencies else 0.0
+        }
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test an API-Hasher endpoint.")
+    parser.add_argument('--url', default='http://127.0.0.1:5000/api/hash', help="Endpoint to load.")
+    parser.add_argument('--concurrency', type=int, default=16, help="Concurrent keep-alive clients (default: 16).")
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds to run (default: 10).")
+    parser.add_argument('--text-size', type=int, default=64, help="Length of the hashed text (default: 64).")
+    args = parser.parse_args(argv)
+
+    body = json.dumps({"text": "x" * args.text_size}).encode('utf-8')
+    print(json.dumps(run_load(args.url, body, args.concurrency, args.duration), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,396 @@
+"""
+Benchmark suite for the API-Hasher hashing core and API.
+
+Measures:
+* core    - calculate_sha256_hash throughput for input sizes from 16 B up to --max-size.
+* api     - /api/hash latency percentiles and requests/s through the Flask test client.
+* json    - JSON decode/encode time of /api/hash payloads and /api/hash requests/s with
+            Flask's default JSON provider versus FastJSONProvider (orjson when installed).
+* replay  - /api/hash latency when replaying an NDJSON file (e.g. requests.jsonl)
+            line by line, and the time to send the whole file to /api/hash/stream.
+* server  - /api/hash requests/s and latency against a real server, either one that is
+            already running (--server-url) or one started for the run (--spawn-server).
+
+Results are written as JSON and compared against a stored baseline
+(benchmarks/baseline.json unless --baseline or --no-baseline is given). The
+run fails (exit code 1) if any metric regressed by more than --threshold.
+
+Examples:
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/baseline.json --no-baseline
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json --threshold 0.15
+    python benchmarks/run_benchmarks.py --suites core --max-size 1G --no-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, REPO_ROOT)
+
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+from app import app, calculate_sha256_hash  # noqa: E402
+from fast_json import FastJSONProvider  # noqa: E402
+from http_load import percentile, run_load  # noqa: E402
+
+SUITES = ('core', 'api', 'json', 'replay', 'server')
+
+# Committed inputs: the baseline results compared against by default, and the
+# NDJSON file of /api/hash payloads replayed by the replay suite.
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, 'baseline.json')
+DEFAULT_REPLAY = os.path.join(BENCHMARKS_DIR, 'replay.ndjson')
+
+SIZE_SUFFIXES = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+# Fewest timed calls per measurement, however long each call takes.
+MIN_CALLS = 3
+
+# Input sizes of the core suite, from 16 B up to 1 GB; runs stop at --max-size.
+CORE_SIZES = (16, 256, 4 * 1024, 64 * 1024, 1024 ** 2, 16 * 1024 ** 2, 64 * 1024 ** 2,
+              256 * 1024 ** 2, 1024 ** 3)
+
+
+def parse_size(text):
+    """Parses sizes such as '16', '64K', '16M' or '1G' into a byte count."""
+    text = text.strip().upper().rstrip('B')
+    if text and text[-1] in SIZE_SUFFIXES:
+        return int(float(text[:-1]) * SIZE_SUFFIXES[text[-1]])
+    return int(text)
+
+
+def format_size(size):
+    """Formats a byte count as the shortest exact '16B', '64KB', '1GB' style label."""
+    for suffix, factor in (('GB', 1024 ** 3), ('MB', 1024 ** 2), ('KB', 1024)):
+        if size >= factor and size % factor == 0:
+            return f"{size // factor}{suffix}"
+    return f"{size}B"
+
+
+def metric(value, unit, higher_is_better):
+    return {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+
+
+def latency_metrics(prefix, latencies, elapsed):
+    """Turns raw latencies (seconds) into percentile and throughput metrics."""
+    latencies = sorted(latencies)
+    return {
+        f"{prefix}.requests_per_s": metric(round(len(latencies) / elapsed, 1), "req/s", True),
+        f"{prefix}.latency_p50_ms": metric(round(percentile(latencies, 0.50) * 1000, 4), "ms", False),
+        f"{prefix}.latency_p90_ms": metric(round(percentile(latencies, 0.90) * 1000, 4), "ms", False),
+        f"{prefix}.latency_p99_ms": metric(round(percentile(latencies, 0.99) * 1000, 4), "ms", False),
+    }
+
+
+def bench_core(max_size, min_time):
+    """
+    Measures calculate_sha256_hash throughput for the CORE_SIZES up to max_size.
+
+    Each size is hashed repeatedly for at least min_time seconds (and at least
+    MIN_CALLS times) and the best rate is kept. Note that a 1 GB run needs
+    roughly 2 GB of free memory (the string plus its UTF-8 encoding).
+    """
+    results = {}
+    for size in CORE_SIZES:
+        if size > max_size:
+            break
+        text = 'a' * size
+        best = best_call_time(calculate_sha256_hash, text, min_time)
+        label = format_size(size)
+        results[f"core.sha256.{label}.throughput_mb_per_s"] = metric(round(size / best / 1e6, 2), "MB/s", True)
+        results[f"core.sha256.{label}.call_us"] = metric(round(best * 1e6, 3), "us", False)
+        del text
+    return results
+
+
+def bench_api(requests_count, text_size):
+    """Measures /api/hash through the Flask test client (no network, no server)."""
+    client = app.test_client()
+    payload = {"text": "x" * text_size}
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(requests_count):
+        start = time.perf_counter()
+        response = client.post('/api/hash', json=payload)
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            raise RuntimeError(f"/api/hash returned {response.status_code}: {response.get_data(as_text=True)}")
+    return latency_metrics("api.test_client.hash", latencies, time.perf_counter() - started)
+
+
+def best_call_time(func, arg, min_time):
+    """
+    Calls func(arg) repeatedly for at least min_time seconds and returns the fastest call in seconds.
+
+    Calls that take longer than min_time are still repeated MIN_CALLS times,
+    so one slow call (page faults, a noisy neighbour) does not become the result.
+    """
+    best = float('inf')
+    total = 0.0
+    calls = 0
+    while total < min_time or calls < MIN_CALLS:
+        calls += 1
+        start = time.perf_counter()
+        func(arg)
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        total += elapsed
+    return best
+
+
+def bench_json(requests_count, text_size, min_time):
+    """
+    Compares Flask's default JSON provider with FastJSONProvider.
+
+    Measures decoding an /api/hash request body, encoding its response, and
+    /api/hash requests/s through the test client with each provider installed.
+    """
+    text = "x" * text_size
+    request_body = json.dumps({"text": text}).encode('utf-8')
+    response_payload = {"original_text": text, "hashed_value": calculate_sha256_hash(text), "algorithm": "sha256"}
+    fast_provider = FastJSONProvider(app)
+    providers = {'default': DefaultJSONProvider(app), f"fast_{fast_provider.backend}": fast_provider}
+
+    results = {}
+    original_provider = app.json
+    client = app.test_client()
+    try:
+        for name, provider in providers.items():
+            decode = best_call_time(provider.loads, request_body, min_time)
+            encode = best_call_time(provider.dumps, response_payload, min_time)
+            results[f"json.{name}.decode_us"] = metric(round(decode * 1e6, 3), "us", False)
+            results[f"json.{name}.encode_us"] = metric(round(encode * 1e6, 3), "us", False)
+
+            app.json = provider
+            started = time.perf_counter()
+            for _ in range(requests_count):
+                client.post('/api/hash', data=request_body, content_type='application/json')
+            elapsed = time.perf_counter() - started
+            results[f"json.{name}.api_hash.requests_per_s"] = metric(round(requests_count / elapsed, 1), "req/s", True)
+    finally:
+        app.json = original_provider
+    return results
+
+
+def load_replay_payloads(path):
+    """
+    Reads an NDJSON file into /api/hash payloads.
+
+    Lines that are JSON objects with a 'text' field are sent as they are; any
+    other non-blank line (such as a requests.jsonl backlog entry) is hashed as text.
+    """
+    payloads = []
+    with open(path, encoding='utf-8') as replay_file:
+        for line in replay_file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError:
+                data = None
+            payloads.append(data if isinstance(data, dict) and 'text' in data else {"text": line})
+    return payloads
+
+
+def bench_replay(path, rounds):
+    """Replays an NDJSON file against /api/hash and /api/hash/stream via the test client."""
+    payloads = load_replay_payloads(path)
+    if not payloads:
+        return {}
+    client = app.test_client()
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for payload in payloads:
+            start = time.perf_counter()
+            client.post('/api/hash', json=payload)
+            latencies.append(time.perf_counter() - start)
+    results = latency_metrics("replay.hash", latencies, time.perf_counter() - started)
+
+    body = ''.join(json.dumps(payload) + '\n' for payload in payloads).encode('utf-8')
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        client.post('/api/hash/stream', data=body, content_type='application/x-ndjson').get_data()
+        best = min(best, time.perf_counter() - start)
+    results["replay.stream.lines_per_s"] = metric(round(len(payloads) / best, 1), "lines/s", True)
+    return results
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server did not start listening on port {port}")
+
+
+def bench_server(url, spawn_server, concurrency, duration, text_size):
+    """Load tests /api/hash on a real server over keep-alive HTTP connections."""
+    process = None
+    if spawn_server:
+        port = free_port()
+        process = subprocess.Popen(
+            [sys.executable, os.path.join(REPO_ROOT, 'serve.py'), '--server', spawn_server, '--port', str(port)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        url = f"http://127.0.0.1:{port}/api/hash"
+    try:
+        if process is not None:
+            wait_for_port(port)
+        body = json.dumps({"text": "x" * text_size}).encode('utf-8')
+        load = run_load(url, body, concurrency, duration)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+
+    prefix = f"server.{spawn_server or 'external'}.hash"
+    return {
+        f"{prefix}.requests_per_s": metric(load['requests_per_s'], "req/s", True),
+        f"{prefix}.latency_p50_ms": metric(load['latency_ms']['p50'], "ms", False),
+        f"{prefix}.latency_p90_ms": metric(load['latency_ms']['p90'], "ms", False),
+        f"{prefix}.latency_p99_ms": metric(load['latency_ms']['p99'], "ms", False),
+        f"{prefix}.errors": metric(load['errors'], "count", False),
+    }
+
+
+def compare_to_baseline(results, baseline, threshold):
+    """
+    Compares metrics present in both runs.
+
+    Args:
+        results (dict): The current run's 'metrics'.
+        baseline (dict): The baseline run's 'metrics'.
+        threshold (float): Allowed relative slowdown, e.g. 0.10 for 10%.
+
+    Returns:
+        list: (name, baseline_value, current_value, change) tuples for every
+              metric that got worse by more than the threshold. A lower-is-better
+              metric with a 0 baseline counts as regressed if it is now above 0.
+    """
+    regressions = []
+    for name, current in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if not previous['value']:
+            if not current['higher_is_better'] and current['value'] > 0:
+                regressions.append((name, previous['value'], current['value'], float('inf')))
+            continue
+        change = (current['value'] - previous['value']) / previous['value']
+        worse = -change if current['higher_is_better'] else change
+        if worse > threshold:
+            regressions.append((name, previous['value'], current['value'], change))
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the API-Hasher hashing core and API.")
+    parser.add_argument('--suites', default='core,api,replay',
+                        help=f"Comma-separated suites to run from {', '.join(SUITES)} (default: core,api,replay).")
+    parser.add_argument('--max-size', default='64M',
+                        help="Largest core input size, e.g. 16M or 1G (default: 64M).")
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help="Seconds spent on each core input size and json operation (default: 0.2).")
+    parser.add_argument('--requests', type=int, default=2000,
+                        help="Requests sent by the api suite and per provider by the json suite (default: 2000).")
+    parser.add_argument('--text-size', type=int, default=64,
+                        help="Length of the text hashed by the api, json and server suites (default: 64).")
+    parser.add_argument('--replay', default=DEFAULT_REPLAY,
+                        help="NDJSON file replayed by the replay suite (default: benchmarks/replay.ndjson).")
+    parser.add_argument('--replay-rounds', type=int, default=20,
+                        help="Times the replay file is replayed (default: 20).")
+    parser.add_argument('--server-url', default=None,
+                        help="Load test an already running server at this /api/hash URL.")
+    parser.add_argument('--spawn-server', default='werkzeug',
+                        help="serve.py --server to start for the server suite when no --server-url is given (default: werkzeug).")
+    parser.add_argument('--concurrency', type=int, default=16, help="Clients for the server suite (default: 16).")
+    parser.add_argument('--duration', type=float, default=5.0, help="Seconds for the server suite (default: 5).")
+    parser.add_argument('--output', default=None, help="Write the results JSON to this file.")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help="Compare against this results JSON file (default: benchmarks/baseline.json).")
+    parser.add_argument('--no-baseline', action='store_true', help="Do not compare against a baseline.")
+    parser.add_argument('--save-baseline', default=None, help="Also write the results to this baseline file.")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Allowed relative regression before failing (default: 0.10).")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    suites = [suite.strip() for suite in args.suites.split(',') if suite.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        print(f"Unknown suites: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    baseline = None
+    if args.baseline and not args.no_baseline:
+        # Read before running, since --save-baseline may overwrite the same file.
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+
+    metrics = {}
+    if 'core' in suites:
+        metrics.update(bench_core(parse_size(args.max_size), args.min_time))
+    if 'api' in suites:
+        metrics.update(bench_api(args.requests, args.text_size))
+    if 'json' in suites:
+        metrics.update(bench_json(args.requests, args.text_size, args.min_time))
+    if 'replay' in suites:
+        if os.path.exists(args.replay):
+            metrics.update(bench_replay(args.replay, args.replay_rounds))
+        else:
+            print(f"Skipping replay suite: {args.replay} not found", file=sys.stderr)
+    if 'server' in suites:
+        spawn_server = None if args.server_url else args.spawn_server
+        metrics.update(bench_server(args.server_url, spawn_server, args.concurrency, args.duration, args.text_size))
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "suites": suites
+        },
+        "metrics": metrics
+    }
+
+    for name, value in sorted(metrics.items()):
+        print(f"{name:55s} {value['value']:>14} {value['unit']}")
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as results_file:
+                json.dump(results, results_file, indent=2, sort_keys=True)
+
+    if baseline is not None:
+        regressions = compare_to_baseline(metrics, baseline['metrics'], args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}:", file=sys.stderr)
+            for name, previous, current, change in regressions:
+                print(f"  {name}: {previous} -> {current} ({change:+.1%})", file=sys.stderr)
+            return 1
+        print(f"\nNo regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,54 +1,447 @@
+import os
 import sys
+import csv
 import json
+import hashlib
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QLabel, QTextEdit, QPushButton,
                              QMessageBox, QFrame, QGraphicsDropShadowEffect,
-                             QProgressBar, QTabWidget, QListWidget, QListWidgetItem,
-                             QSplitter, QGroupBox, QGridLayout, QSpinBox,
-                             QCheckBox, QComboBox, QLineEdit)
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QPropertyAnimation, QEasingCurve, QTimer, QDateTime, QRect
-from PyQt6.QtGui import QFont, QPalette, QColor, QIcon, QLinearGradient, QPainter, QBrush, QPixmap
+                             QProgressBar, QListView, QAbstractItemView, QSplitter,
+                             QCheckBox, QComboBox, QLineEdit, QFileDialog, QTableView, QHeaderView)
+from PyQt6.QtCore import (Qt, pyqtSignal, QPropertyAnimation, QEasingCurve, QDateTime,
+                          QObject, QRunnable, QThreadPool, QAbstractListModel, QAbstractTableModel, QModelIndex,
+                          QStandardPaths)
+from PyQt6.QtGui import QFont, QColor
+
+try:
+    from .history_store import HistoryStore # python -m desktop_gui.hasher_gui
+except ImportError:
+    from history_store import HistoryStore # python desktop_gui/hasher_gui.py
+
+# HTTP client settings: connections kept open per host, retries for failed connections
+# and 502/503/504 responses, the backoff factor between retries (0.3 waits 0.3s, 0.6s,
+# 1.2s, ...) and the request timeout in seconds.
+HTTP_POOL_SIZE = 4
+HTTP_MAX_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.3
+HTTP_TIMEOUT = 10
+
+# Hashing engines: "Auto" uses the API server when an endpoint is set and hashes
+# locally when it is not, or when the server cannot be reached. After a failed
+# attempt, "Auto" stays local for SERVER_RETRY_INTERVAL seconds before trying the
+# server again.
+ENGINE_AUTO = "Auto"
+ENGINE_SERVER = "Server"
+ENGINE_LOCAL = "Local"
+ENGINE_FALLBACK = "Local (server unreachable)"
+SERVER_RETRY_INTERVAL = 30
+# "Auto" probes the server without retries and gives up connecting after
+# AUTO_CONNECT_TIMEOUT seconds, so an unreachable server costs one short wait.
+AUTO_CONNECT_TIMEOUT = 2
+
+# Batch mode: threads hashing at once (each one uses a pooled HTTP connection), lines
+# per /api/hash/batch request, and bytes read per step when hashing files locally.
+BATCH_WORKERS = HTTP_POOL_SIZE
+BATCH_CHUNK_LINES = 500
+FILE_CHUNK_SIZE = 1024 * 1024
+
+# History: entries read from the store per page as the list scrolls (newest first, or
+# the newest matches of a search), and the retention limits of the on-disk store.
+HISTORY_PAGE_SIZE = 200
+HISTORY_MAX_ENTRIES = 100000
+HISTORY_MAX_AGE_DAYS = 365
+
+
+def validate_text(text, field_name="'text' field"):
+    """The API's check on text to hash: the error message it returns for empty or whitespace-only text, or None"""
+    if not text.strip():
+        return f"{field_name} cannot be empty or consist only of whitespace"
+    return None
+
+
+def hash_text_locally(text):
+    """Hash text in-process the way the API does (SHA-256 of the UTF-8 bytes), in the API's result format"""
+    validation_error = validate_text(text)
+    if validation_error is not None:
+        raise HashError(validation_error)
+    return {
+        'original_text': text,
+        'hashed_value': hashlib.sha256(text.encode('utf-8')).hexdigest(),
+        'algorithm': 'sha256'
+    }
+
+
+def hash_file_locally(path):
+    """Hash a file in-process in FILE_CHUNK_SIZE pieces, in the /api/hash/raw result format"""
+    hasher = hashlib.sha256()
+    byte_count = 0
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(FILE_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+            byte_count += len(chunk)
+    return {'hashed_value': hasher.hexdigest(), 'algorithm': 'sha256', 'byte_count': byte_count}
+
+
+def default_history_path():
+    """The history database in the per-user application data folder"""
+    folder = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation)
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, "history.sqlite3")
+
+
+def uses_server(engine, api_url):
+    """Whether a hashing engine sends its first attempt to the API server"""
+    return engine == ENGINE_SERVER or (engine == ENGINE_AUTO and bool(api_url))
+
+
+def api_endpoint(api_url, name):
+    """Derive a sibling endpoint such as /api/hash/batch from the configured /api/hash URL"""
+    return f"{api_url.rstrip('/')}/{name}"
+
+
+class HashError(Exception):
+    """A hash request failed; the message is shown to the user"""
+
+
+class ServerUnreachable(HashError):
+    """The API server could not be reached, so "Auto" may hash locally instead"""
+
+
+def call_api(session, url, timeout=HTTP_TIMEOUT, **kwargs):
+    """POST to the API and return the JSON response, raising HashError with a user-facing message"""
+    try:
+        response = session.post(url, timeout=timeout, **kwargs)
+        result = response.json()
+    except requests.exceptions.Timeout:
+        raise ServerUnreachable("⏱️ Request timed out. Please check your connection.")
+    except requests.exceptions.ConnectionError:
+        raise ServerUnreachable(
+            "🔌 Could not connect to the server. Make sure the Flask app is running on http://127.0.0.1:5000")
+    except json.JSONDecodeError:
+        raise HashError("❌ Invalid response from server.")
+
+    if response.status_code != 200:
+        raise HashError(result.get('error', f'Server returned status code: {response.status_code}'))
+    return result
+
+
+def create_http_session(pool_size=HTTP_POOL_SIZE, max_retries=HTTP_MAX_RETRIES, backoff_factor=HTTP_BACKOFF_FACTOR):
+    """
+    Create the HTTP session shared by all API requests.
+
+    The session keeps connections to the API open between requests (HTTP/1.1
+    keep-alive), so repeated hashing skips TCP connection setup. Connection
+    failures and 502/503/504 responses are retried with exponential backoff;
+    hashing is idempotent, so retrying a POST is safe. Read timeouts are not
+    retried, so a slow server is reported after one timeout.
+    """
+    retry = Retry(total=max_retries, connect=max_retries, read=False, status=max_retries,
+                  backoff_factor=backoff_factor, status_forcelist=(502, 503, 504),
+                  allowed_methods=frozenset({'GET', 'POST'}), raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
 
-
-class HashWorker(QThread):
-    """Worker thread to handle API requests without blocking the UI"""
+class HashSignals(QObject):
+    """Signals for HashTask, which as a QRunnable cannot define its own"""
     result_ready = pyqtSignal(dict)
     error_occurred = pyqtSignal(str)
-    progress_update = pyqtSignal(int)
+    finished = pyqtSignal()
+
+
+class HashTask(QRunnable):
+    """
+    Hash one text on the API server or locally without blocking the UI.
 
-    def __init__(self, text, api_url):
+    Tasks run on the window's hashing QThreadPool, which keeps its thread
+    alive between requests, so a click costs no thread setup.
+    """
+
+    def __init__(self, text, api_url, session, engine=ENGINE_SERVER, probe_session=None):
         super().__init__()
+        self.signals = HashSignals()
         self.text = text
         self.api_url = api_url
+        self.session = session
+        self.engine = engine
+        self.probe_session = probe_session # Retry-free session used by "Auto"
 
     def run(self):
         try:
-            self.progress_update.emit(20)
-            headers = {'Content-Type': 'application/json'}
-            data = {'text': self.text}
+            self.hash_text()
+        finally:
+            self.signals.finished.emit()
+
+    def hash_text(self):
+        started = time.perf_counter() # Latency includes any failed attempt at the server
+        try:
+            if uses_server(self.engine, self.api_url):
+                try:
+                    if self.engine == ENGINE_AUTO:
+                        result = call_api(self.probe_session or self.session, self.api_url,
+                                          timeout=(AUTO_CONNECT_TIMEOUT, HTTP_TIMEOUT), json={'text': self.text})
+                    else:
+                        result = call_api(self.session, self.api_url, json={'text': self.text})
+                    engine = ENGINE_SERVER
+                except ServerUnreachable:
+                    if self.engine != ENGINE_AUTO:
+                        raise
+                    result = hash_text_locally(self.text)
+                    engine = ENGINE_FALLBACK
+            else:
+                result = hash_text_locally(self.text)
+                engine = ENGINE_LOCAL
+        except HashError as e:
+            self.signals.error_occurred.emit(str(e))
+            return
+        except Exception as e:
+            self.signals.error_occurred.emit(f"⚠️ An unexpected error occurred: {str(e)}")
+            return
+
+        result['engine'] = engine
+        result['latency_ms'] = (time.perf_counter() - started) * 1000
+        self.signals.result_ready.emit(result)
+
 
-            self.progress_update.emit(50)
-            response = requests.post(self.api_url, json=data, headers=headers, timeout=10)
+class BatchSignals(QObject):
+    """Signals for BatchTask, which as a QRunnable cannot define its own"""
+    # (finished rows, number of items the task accounted for, including skipped ones)
+    chunk_done = pyqtSignal(list, int)
 
-            self.progress_update.emit(80)
 
-            if response.status_code == 200:
-                self.progress_update.emit(100)
-                self.result_ready.emit(response.json())
+class BatchRun:
+    """State shared by the tasks of one batch: cancellation, server reachability and signals"""
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self.server_down = threading.Event() # Set once "Auto" fell back, so later chunks skip the server
+        self.signals = BatchSignals()
+
+
+class BatchTask(QRunnable):
+    """
+    Hash one chunk of a batch on a QThreadPool.
+
+    A chunk is a list of lines, sent to /api/hash/batch in one request, or a
+    single file, streamed to /api/hash/raw. Local hashing works on the same
+    chunks. Each finished row is a dict with 'number' (the 1-based line or file
+    number), 'input', 'hashed_value', 'byte_count', 'engine' and 'error'.
+    """
+
+    def __init__(self, kind, items, api_url, session, engine, batch, probe_session=None):
+        super().__init__()
+        self.kind = kind # 'lines' or 'files'
+        self.items = items # (number, line or file path) pairs
+        self.api_url = api_url
+        self.session = session
+        self.engine = engine
+        self.batch = batch
+        self.probe_session = probe_session # Retry-free session used by "Auto"
+
+    def run(self):
+        rows = []
+        if not self.batch.cancelled.is_set():
+            try:
+                rows = self.hash_lines() if self.kind == 'lines' else self.hash_files()
+            except Exception as e:
+                rows = [self.make_row(number, value, engine=self.engine, error=str(e)) for number, value in self.items]
+        self.batch.signals.chunk_done.emit(rows, len(self.items))
+
+    def first_engine(self):
+        """The engine to try first: the server, unless it is off or "Auto" already found it unreachable"""
+        if not uses_server(self.engine, self.api_url):
+            return ENGINE_LOCAL
+        if self.engine == ENGINE_AUTO and self.batch.server_down.is_set():
+            return ENGINE_FALLBACK
+        return ENGINE_SERVER
+
+    def call_server(self, name, **kwargs):
+        """POST to a sibling API endpoint; "Auto" skips retries and gives up connecting quickly"""
+        if self.engine == ENGINE_AUTO:
+            return call_api(self.probe_session or self.session, api_endpoint(self.api_url, name),
+                            timeout=(AUTO_CONNECT_TIMEOUT, HTTP_TIMEOUT), **kwargs)
+        return call_api(self.session, api_endpoint(self.api_url, name), **kwargs)
+
+    @staticmethod
+    def make_row(number, value, hashed_value='', byte_count=0, engine='', error=''):
+        return {'number': number, 'input': value, 'hashed_value': hashed_value,
+                'byte_count': byte_count, 'engine': engine, 'error': error}
+
+    def hash_lines(self):
+        engine = self.first_engine()
+        if engine == ENGINE_SERVER:
+            texts = [line for _, line in self.items]
+            try:
+                response = self.call_server('batch', json={'texts': texts})
+            except ServerUnreachable:
+                if self.engine != ENGINE_AUTO:
+                    raise
+                self.batch.server_down.set()
+                engine = ENGINE_FALLBACK
             else:
-                error_data = response.json()
-                error_msg = error_data.get('error', f'Server returned status code: {response.status_code}')
-                self.error_occurred.emit(error_msg)
-        except requests.exceptions.Timeout:
-            self.error_occurred.emit("⏱️ Request timed out. Please check your connection.")
-        except requests.exceptions.ConnectionError:
-            self.error_occurred.emit(
-                "🔌 Could not connect to the server. Make sure the Flask app is running on http://127.0.0.1:5000")
-        except json.JSONDecodeError:
-            self.error_occurred.emit("❌ Invalid response from server.")
-        except Exception as e:
-            self.error_occurred.emit(f"⚠️ An unexpected error occurred: {str(e)}")
+                return [self.make_row(number, line, result.get('hashed_value', ''), len(line.encode('utf-8')),
+                                      ENGINE_SERVER, result.get('error', ''))
+                        for (number, line), result in zip(self.items, response['results'])]
+
+        rows = []
+        for number, line in self.items:
+            validation_error = validate_text(line, "Item")
+            if validation_error is not None:
+                rows.append(self.make_row(number, line, byte_count=len(line.encode('utf-8')), engine=engine,
+                                          error=validation_error))
+            else:
+                rows.append(self.make_row(number, line, hash_text_locally(line)['hashed_value'],
+                                          len(line.encode('utf-8')), engine))
+        return rows
+
+    def hash_files(self):
+        rows = []
+        for number, path in self.items:
+            if self.batch.cancelled.is_set():
+                break
+            engine = self.first_engine()
+            try:
+                if engine == ENGINE_SERVER:
+                    try:
+                        with open(path, 'rb') as file:
+                            result = self.call_server('raw', data=file,
+                                                      headers={'Content-Type': 'application/octet-stream'})
+                    except ServerUnreachable:
+                        if self.engine != ENGINE_AUTO:
+                            raise
+                        self.batch.server_down.set()
+                        engine = ENGINE_FALLBACK
+                if engine != ENGINE_SERVER:
+                    result = hash_file_locally(path)
+            except OSError as e:
+                rows.append(self.make_row(number, path, engine=engine, error=f"Could not read file: {e.strerror or e}"))
+            except HashError as e:
+                rows.append(self.make_row(number, path, engine=engine, error=str(e)))
+            else:
+                rows.append(self.make_row(number, path, result['hashed_value'], result['byte_count'], engine))
+        return rows
+
+
+class BatchResultsModel(QAbstractTableModel):
+    """Table model of batch results; rows arrive a chunk at a time from BatchTask"""
+    COLUMNS = (('number', "#"), ('input', "Input"), ('hashed_value', "SHA-256"),
+               ('byte_count', "Bytes"), ('engine', "Engine"), ('error', "Error"))
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return self.rows[index.row()][self.COLUMNS[index.column()][0]]
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.COLUMNS[section][1]
+        return None
+
+    def add_rows(self, rows):
+        if not rows:
+            return
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(rows) - 1)
+        self.rows.extend(rows)
+        self.endInsertRows()
+
+    def sort_by_number(self):
+        self.beginResetModel()
+        self.rows.sort(key=lambda row: row['number'])
+        self.endResetModel()
+
+    def clear(self):
+        self.beginResetModel()
+        self.rows = []
+        self.endResetModel()
+
+
+class HistoryListModel(QAbstractListModel):
+    """
+    List model over the history store, newest first.
+
+    Rows are read a page at a time: the view calls fetchMore() as it scrolls
+    towards the end, so only the pages that have been scrolled into view are
+    in memory, and the view only paints the visible rows. A search is run by
+    the store on its indexes, and the model then pages through the matches.
+    """
+
+    def __init__(self, store, page_size=HISTORY_PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.page_size = page_size
+        self.search_text = ""
+        self.rows = []
+        self.exhausted = False
+        self.reload()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        history_entry = self.rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"🕐 {history_entry['timestamp']}\n📝 {history_entry['preview']}\n🔐 {history_entry['hash'][:32]}..."
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return history_entry['hash']
+        if role == Qt.ItemDataRole.UserRole:
+            return history_entry
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted:
+            return
+        before_id = self.rows[-1]['id'] if self.rows else None
+        entries = self.store.search(self.search_text, self.page_size, before_id)
+        self.exhausted = len(entries) < self.page_size
+        if entries:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(entries) - 1)
+            self.rows.extend(entries)
+            self.endInsertRows()
+
+    def set_search(self, search_text):
+        """Show only the entries matching a search (an empty search shows all)"""
+        self.search_text = search_text.strip()
+        self.reload()
+
+    def reload(self):
+        """Drop the loaded pages and read the first page again"""
+        self.beginResetModel()
+        self.rows = []
+        self.exhausted = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def add_entry(self, history_entry):
+        """Show a newly stored entry at the top"""
+        if self.search_text:
+            self.reload() # The store decides whether the new entry matches
+            return
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self.rows.insert(0, history_entry)
+        self.endInsertRows()
 
 
 class AnimatedButton(QPushButton):
@@ -88,13 +481,24 @@ class ModernCard(QFrame):
 
 
 class APIHasherDesktop(QMainWindow):
-    def __init__(self):
+    def __init__(self, history_path=None):
         super().__init__()
         self.api_url = "http://127.0.0.1:5000/api/hash"
-        self.history = []
+        self.http_session = create_http_session()
+        self.probe_session = create_http_session(max_retries=0)
+        self.server_retry_at = 0 # time.monotonic() before which "Auto" skips an unreachable server
+        self.hash_pool = QThreadPool() # One long-lived thread for single hash requests
+        self.hash_pool.setMaxThreadCount(1)
+        self.hash_pool.setExpiryTimeout(-1)
+        self.batch_pool = QThreadPool()
+        self.batch_pool.setMaxThreadCount(BATCH_WORKERS)
+        self.batch = None # The running BatchRun
+        self.history_store = HistoryStore(history_path or default_history_path(),
+                                          max_entries=HISTORY_MAX_ENTRIES, max_age_days=HISTORY_MAX_AGE_DAYS)
         self.dark_mode = False
         self.init_ui()
         self.apply_light_theme()
+        self.setAcceptDrops(True)
 
     def init_ui(self):
         self.setWindowTitle("🔐 API-Hasher Pro - Windows Edition")
@@ -169,6 +573,7 @@ class APIHasherDesktop(QMainWindow):
         self.text_input.setPlaceholderText(
             "Enter your text here...\n\nYou can paste:\n• Passwords\n• API Keys\n• Source Code\n• Any text content")
         self.text_input.textChanged.connect(self.on_text_changed)
+        self.text_input.setAcceptDrops(False) # Dropped files go to the window, which hashes them as a batch
         input_container_layout.addWidget(self.text_input)
 
         input_card_layout.addWidget(input_container)
@@ -216,6 +621,24 @@ class APIHasherDesktop(QMainWindow):
 
         input_card_layout.addWidget(button_container)
 
+        # Batch buttons
+        batch_button_container = QWidget()
+        batch_button_layout = QHBoxLayout(batch_button_container)
+        batch_button_layout.setSpacing(10)
+
+        self.hash_lines_button = AnimatedButton("📑 Hash Each Line")
+        self.hash_lines_button.setObjectName("secondaryButton")
+        self.hash_lines_button.clicked.connect(self.hash_lines)
+        batch_button_layout.addWidget(self.hash_lines_button)
+
+        self.hash_files_button = AnimatedButton("📁 Hash Files")
+        self.hash_files_button.setObjectName("secondaryButton")
+        self.hash_files_button.setToolTip("You can also drop files onto the window")
+        self.hash_files_button.clicked.connect(self.choose_files)
+        batch_button_layout.addWidget(self.hash_files_button)
+
+        input_card_layout.addWidget(batch_button_container)
+
         # Progress indicator
         self.progress_bar = QProgressBar()
         self.progress_bar.setObjectName("progressBar")
@@ -275,6 +698,52 @@ class APIHasherDesktop(QMainWindow):
         result_card_layout.addWidget(self.hash_info)
 
         left_layout.addWidget(self.result_card)
+
+        # Batch results card
+        self.batch_card = ModernCard()
+        self.batch_card.hide()
+        batch_card_layout = QVBoxLayout(self.batch_card)
+
+        batch_header = QLabel("📦 Batch Results")
+        batch_header.setObjectName("cardHeader")
+        batch_card_layout.addWidget(batch_header)
+
+        self.batch_progress = QProgressBar()
+        self.batch_progress.setObjectName("progressBar")
+        self.batch_progress.setTextVisible(False)
+        batch_card_layout.addWidget(self.batch_progress)
+
+        self.batch_info = QLabel()
+        self.batch_info.setObjectName("hashInfo")
+        batch_card_layout.addWidget(self.batch_info)
+
+        self.batch_model = BatchResultsModel(self)
+        self.batch_table = QTableView()
+        self.batch_table.setObjectName("batchTable")
+        self.batch_table.setModel(self.batch_model)
+        self.batch_table.verticalHeader().hide()
+        self.batch_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.batch_table.horizontalHeader().setStretchLastSection(True)
+        batch_card_layout.addWidget(self.batch_table)
+
+        batch_actions = QWidget()
+        batch_actions_layout = QHBoxLayout(batch_actions)
+        batch_actions_layout.setSpacing(10)
+
+        self.cancel_batch_btn = AnimatedButton("⏹️ Cancel")
+        self.cancel_batch_btn.setObjectName("smallButton")
+        self.cancel_batch_btn.clicked.connect(self.cancel_batch)
+        batch_actions_layout.addWidget(self.cancel_batch_btn)
+
+        self.export_batch_btn = AnimatedButton("💾 Export CSV/JSON")
+        self.export_batch_btn.setObjectName("actionButton")
+        self.export_batch_btn.clicked.connect(self.export_batch_results)
+        batch_actions_layout.addWidget(self.export_batch_btn)
+
+        batch_actions_layout.addStretch()
+        batch_card_layout.addWidget(batch_actions)
+
+        left_layout.addWidget(self.batch_card)
         left_layout.addStretch()
 
         # Right side - History and tools
@@ -311,9 +780,13 @@ class APIHasherDesktop(QMainWindow):
         history_card_layout.addWidget(self.search_input)
 
         # History list
-        self.history_list = QListWidget()
+        self.history_model = HistoryListModel(self.history_store, parent=self)
+        self.history_list = QListView()
         self.history_list.setObjectName("historyList")
-        self.history_list.itemDoubleClicked.connect(self.load_from_history)
+        self.history_list.setModel(self.history_model)
+        self.history_list.setUniformItemSizes(True) # Lets the view lay out rows without measuring each one
+        self.history_list.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.history_list.doubleClicked.connect(self.load_from_history)
         history_card_layout.addWidget(self.history_list)
 
         right_layout.addWidget(history_card)
@@ -326,11 +799,6 @@ class APIHasherDesktop(QMainWindow):
         tools_header.setObjectName("cardHeader")
         tools_card_layout.addWidget(tools_header)
 
-        # REMOVED: Batch processing
-        # self.batch_check = QCheckBox("Enable Batch Processing")
-        # self.batch_check.setObjectName("toolOption")
-        # tools_card_layout.addWidget(self.batch_check)
-
         # Auto-copy
         self.auto_copy_check = QCheckBox("Auto-copy hash to clipboard")
         self.auto_copy_check.setObjectName("toolOption")
@@ -354,6 +822,26 @@ class APIHasherDesktop(QMainWindow):
 
         tools_card_layout.addWidget(format_widget)
 
+        # Hashing engine
+        engine_widget = QWidget()
+        engine_layout = QHBoxLayout(engine_widget)
+        engine_layout.setContentsMargins(0, 0, 0, 0)
+
+        engine_label = QLabel("Engine:")
+        engine_label.setObjectName("toolLabel")
+        engine_layout.addWidget(engine_label)
+
+        self.engine_combo = QComboBox()
+        self.engine_combo.addItems([ENGINE_AUTO, ENGINE_SERVER, ENGINE_LOCAL])
+        self.engine_combo.setToolTip("Auto uses the API server when an endpoint is set and "
+                                     "hashes locally when it is not, or when the server is unreachable")
+        self.engine_combo.currentTextChanged.connect(self.update_engine)
+        engine_layout.addWidget(self.engine_combo)
+
+        engine_layout.addStretch()
+
+        tools_card_layout.addWidget(engine_widget)
+
         right_layout.addWidget(tools_card)
         right_layout.addStretch()
 
@@ -586,6 +1074,14 @@ class APIHasherDesktop(QMainWindow):
                         border-color: #1976d2;
                     }
 
+                    #batchTable {
+                        border: 1px solid #e0e0e0;
+                        border-radius: 8px;
+                        background-color: #fafafa;
+                        font-family: 'Consolas', 'Monaco', monospace;
+                        min-height: 200px;
+                    }
+
                     #smallButton {
                         background-color: #ef5350;
                         color: white;
@@ -859,6 +1355,15 @@ class APIHasherDesktop(QMainWindow):
                         border-color: #64b5f6;
                     }
 
+                    #batchTable {
+                        border: 1px solid #333333;
+                        border-radius: 8px;
+                        background-color: #2a2a2a;
+                        color: #ffffff;
+                        font-family: 'Consolas', 'Monaco', monospace;
+                        min-height: 200px;
+                    }
+
                     #smallButton {
                         background-color: #f44336;
                         color: white;
@@ -914,8 +1419,14 @@ class APIHasherDesktop(QMainWindow):
     def update_api_url(self, text):
         """Update API URL from input field"""
         self.api_url = text.strip()
+        self.server_retry_at = 0
         self.update_status(f"API endpoint updated: {self.api_url}")
 
+    def update_engine(self, engine):
+        """Switch the hashing engine"""
+        self.server_retry_at = 0
+        self.update_status(f"Hashing engine: {engine}")
+
     def update_status(self, message):
         """Update status bar message"""
         self.status_bar.showMessage(f"🔹 {message}")
@@ -961,23 +1472,22 @@ class APIHasherDesktop(QMainWindow):
             self.show_error("Please enter some text to hash!")
             return
 
-        # Disable button and show progress
+        # Disable button and show a busy indicator; a single request has no measurable progress
         self.hash_button.setEnabled(False)
         self.hash_button.setText("⏳ Processing...")
+        self.progress_bar.setRange(0, 0)
         self.progress_bar.show()
-        self.progress_bar.setValue(0)
 
-        # Start worker thread
-        self.worker = HashWorker(text, self.api_url)
-        self.worker.result_ready.connect(self.on_hash_result)
-        self.worker.error_occurred.connect(self.on_hash_error)
-        self.worker.progress_update.connect(self.update_progress)
-        self.worker.finished.connect(self.on_request_finished)
-        self.worker.start()
+        engine = self.engine_combo.currentText()
+        if engine == ENGINE_AUTO and time.monotonic() < self.server_retry_at:
+            engine = ENGINE_LOCAL
 
-    def update_progress(self, value):
-        """Update progress bar"""
-        self.progress_bar.setValue(value)
+        # Hand the request to the hashing thread
+        task = HashTask(text, self.api_url, self.http_session, engine, self.probe_session)
+        task.signals.result_ready.connect(self.on_hash_result)
+        task.signals.error_occurred.connect(self.on_hash_error)
+        task.signals.finished.connect(self.on_request_finished)
+        self.hash_pool.start(task)
 
     def on_hash_result(self, result):
         """Handle successful hash result"""
@@ -997,21 +1507,22 @@ class APIHasherDesktop(QMainWindow):
 
         # Update hash info
         timestamp = QDateTime.currentDateTime().toString("yyyy-MM-dd hh:mm:ss")
-        self.hash_info.setText(f"Generated at: {timestamp} | Length: {len(hash_value)} characters")
+        self.hash_info.setText(f"Generated at: {timestamp} | Length: {len(hash_value)} characters | "
+                               f"Engine: {result['engine']} | Latency: {result['latency_ms']:.2f} ms")
+
+        if result['engine'] == ENGINE_FALLBACK:
+            self.server_retry_at = time.monotonic() + SERVER_RETRY_INTERVAL
 
         # Show result card
         self.result_card.show()
 
         # Auto-copy if enabled
+        timing = f"({result['engine']}, {result['latency_ms']:.2f} ms)"
         if self.auto_copy_check.isChecked():
             self.copy_hash()
-            self.update_status("Hash generated and copied to clipboard!")
+            self.update_status(f"Hash generated and copied to clipboard! {timing}")
         else:
-            self.update_status("Hash generated successfully!")
-
-        # REMOVED: Auto-save to history based on batch_check
-        # if self.batch_check.isChecked():
-        #     self.save_to_history()
+            self.update_status(f"Hash generated successfully! {timing}")
 
     def on_hash_error(self, error_msg):
         """Handle hash generation error"""
@@ -1024,6 +1535,156 @@ class APIHasherDesktop(QMainWindow):
         self.hash_button.setText("⚡ Generate SHA-256 Hash")
         self.progress_bar.hide()
 
+    def hash_lines(self):
+        """Hash each non-empty line of the input as a batch"""
+        lines = [(number, line) for number, line in enumerate(self.text_input.toPlainText().splitlines(), 1) if line]
+        if not lines:
+            self.show_error("Please enter some lines to hash!")
+            return
+        chunks = [lines[start:start + BATCH_CHUNK_LINES] for start in range(0, len(lines), BATCH_CHUNK_LINES)]
+        self.start_batch('lines', chunks, len(lines))
+
+    def choose_files(self):
+        """Pick files to hash as a batch"""
+        paths, _ = QFileDialog.getOpenFileNames(self, "Select Files to Hash")
+        if paths:
+            self.hash_files(paths)
+
+    def hash_files(self, paths):
+        """Hash files as a batch, one task per file"""
+        self.start_batch('files', [[(number, path)] for number, path in enumerate(paths, 1)], len(paths))
+
+    def dragEnterEvent(self, event):
+        """Accept dragged local files"""
+        if any(url.isLocalFile() for url in event.mimeData().urls()):
+            event.acceptProposedAction()
+
+    def dropEvent(self, event):
+        """Hash dropped files as a batch; folders are skipped"""
+        paths = [url.toLocalFile() for url in event.mimeData().urls() if url.isLocalFile()]
+        paths = [path for path in paths if os.path.isfile(path)]
+        if paths:
+            event.acceptProposedAction()
+            self.hash_files(paths)
+
+    def start_batch(self, kind, chunks, total):
+        """Queue batch chunks on the thread pool"""
+        if self.batch is not None:
+            self.show_error("A batch is already running. Wait for it to finish or cancel it first.")
+            return
+
+        engine = self.engine_combo.currentText()
+        if engine == ENGINE_AUTO and time.monotonic() < self.server_retry_at:
+            engine = ENGINE_LOCAL
+
+        self.batch = BatchRun()
+        self.batch.signals.chunk_done.connect(self.on_batch_chunk)
+        self.batch_total = total
+        self.batch_done = 0
+        self.batch_bytes = 0
+        self.batch_errors = 0
+        self.batch_started = time.perf_counter()
+
+        self.batch_model.clear()
+        self.batch_progress.setRange(0, total)
+        self.batch_progress.setValue(0)
+        self.batch_progress.show()
+        self.batch_card.show()
+        self.hash_lines_button.setEnabled(False)
+        self.hash_files_button.setEnabled(False)
+        self.cancel_batch_btn.setEnabled(True)
+        self.export_batch_btn.setEnabled(False)
+        self.update_batch_info()
+        self.update_status(f"Hashing {total:,} {kind}...")
+
+        for chunk in chunks:
+            self.batch_pool.start(BatchTask(kind, chunk, self.api_url, self.http_session, engine, self.batch,
+                                            self.probe_session))
+
+    def on_batch_chunk(self, rows, item_count):
+        """Add a finished chunk and update progress"""
+        self.batch_model.add_rows(rows)
+        self.batch_done += item_count
+        self.batch_bytes += sum(row['byte_count'] for row in rows)
+        self.batch_errors += sum(1 for row in rows if row['error'])
+        if any(row['engine'] == ENGINE_FALLBACK for row in rows):
+            self.server_retry_at = time.monotonic() + SERVER_RETRY_INTERVAL
+        self.batch_progress.setValue(self.batch_done)
+        self.update_batch_info()
+        if self.batch_done == self.batch_total:
+            self.finish_batch()
+
+    def update_batch_info(self):
+        """Show batch progress and throughput"""
+        elapsed = max(time.perf_counter() - self.batch_started, 1e-6)
+        self.batch_info.setText(
+            f"{self.batch_done:,} / {self.batch_total:,} items | {self.batch_done / elapsed:,.0f} items/s | "
+            f"{self.batch_bytes / elapsed / 1e6:,.1f} MB/s | Errors: {self.batch_errors:,}")
+
+    def finish_batch(self):
+        """Re-enable the batch controls once every chunk has reported"""
+        cancelled = self.batch.cancelled.is_set()
+        self.batch = None
+        self.batch_model.sort_by_number()
+        self.batch_progress.hide()
+        self.hash_lines_button.setEnabled(True)
+        self.hash_files_button.setEnabled(True)
+        self.cancel_batch_btn.setEnabled(False)
+        self.export_batch_btn.setEnabled(bool(self.batch_model.rows))
+
+        elapsed = time.perf_counter() - self.batch_started
+        hashed = len(self.batch_model.rows) - self.batch_errors
+        if cancelled:
+            self.update_status(f"Batch cancelled: {hashed:,} of {self.batch_total:,} items hashed")
+        else:
+            self.update_status(f"Batch finished: {hashed:,} items hashed in {elapsed:.2f} s")
+
+    def cancel_batch(self):
+        """Stop the running batch; chunks already in progress finish, the rest are skipped"""
+        if self.batch is not None:
+            self.batch.cancelled.set()
+            self.cancel_batch_btn.setEnabled(False)
+            self.update_status("Cancelling batch...")
+
+    def export_batch_results(self):
+        """Save batch results as CSV or JSON"""
+        if not self.batch_model.rows:
+            self.show_error("No batch results to export!")
+            return
+
+        path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Export Results", "hash_results.csv", "CSV Files (*.csv);;JSON Files (*.json)")
+        if not path:
+            return
+
+        fields = [key for key, _ in BatchResultsModel.COLUMNS]
+        extension = os.path.splitext(path)[1].lower()
+        as_json = extension == '.json' or (extension != '.csv' and selected_filter.startswith("JSON"))
+        try:
+            if as_json:
+                with open(path, 'w', encoding='utf-8') as file:
+                    json.dump(self.batch_model.rows, file, ensure_ascii=False, indent=2)
+            else:
+                with open(path, 'w', encoding='utf-8', newline='') as file:
+                    writer = csv.DictWriter(file, fieldnames=fields)
+                    writer.writeheader()
+                    writer.writerows(self.batch_model.rows)
+        except OSError as e:
+            self.show_error(f"Could not export results: {e.strerror or e}")
+            return
+        self.update_status(f"Exported {len(self.batch_model.rows):,} results to {path}")
+
+    def closeEvent(self, event):
+        """Stop batch work and close pooled connections when the window closes"""
+        if self.batch is not None:
+            self.batch.cancelled.set()
+        self.hash_pool.waitForDone()
+        self.batch_pool.waitForDone()
+        self.http_session.close()
+        self.probe_session.close()
+        self.history_store.close()
+        super().closeEvent(event)
+
     def show_error(self, message):
         """Show error message dialog"""
         msg = QMessageBox()
@@ -1046,56 +1707,27 @@ class APIHasherDesktop(QMainWindow):
             return
 
         timestamp = QDateTime.currentDateTime().toString("yyyy-MM-dd hh:mm:ss")
-        original_text = self.current_result['original_text']
-        hash_value = self.current_result['hashed_value']
-
-        # Create preview
-        preview = original_text[:50] + "..." if len(original_text) > 50 else original_text
-        preview = preview.replace('\n', ' ')
-
-        # Create history entry
-        history_entry = {
-            'timestamp': timestamp,
-            'original_text': original_text,
-            'hash': hash_value,
-            'preview': preview
-        }
-
-        self.history.append(history_entry)
-
-        # Add to history list
-        item_text = f"🕐 {timestamp}\n📝 {preview}\n🔐 {hash_value[:32]}..."
-        item = QListWidgetItem(item_text)
-        item.setData(Qt.ItemDataRole.UserRole, history_entry)
-        self.history_list.insertItem(0, item)
-
+        history_entry = self.history_store.add(self.current_result['original_text'], self.current_result['hashed_value'],
+                                               self.current_result.get('algorithm', 'sha256'), timestamp)
+        self.history_model.add_entry(history_entry)
         self.update_status("Saved to history!")
 
-    def load_from_history(self, item):
-        """Load text from history item"""
-        history_entry = item.data(Qt.ItemDataRole.UserRole)
+    def load_from_history(self, index):
+        """Load text from history item; the full text is read from the store only now"""
+        history_entry = index.data(Qt.ItemDataRole.UserRole)
         if history_entry:
-            self.text_input.setPlainText(history_entry['original_text'])
+            original_text = self.history_store.get_text(history_entry['id'])
+            if original_text is None:
+                self.show_error("This entry is no longer in the history.")
+                return
+            self.text_input.setPlainText(original_text)
             self.hash_display.setPlainText(history_entry['hash'])
             self.result_card.show()
             self.update_status("Loaded from history")
 
     def filter_history(self, search_text):
-        """Filter history items based on search text"""
-        search_text = search_text.lower()
-
-        for i in range(self.history_list.count()):
-            item = self.history_list.item(i)
-            history_entry = item.data(Qt.ItemDataRole.UserRole)
-
-            if history_entry:
-                # Search in preview and hash
-                if (search_text in history_entry['preview'].lower() or
-                        search_text in history_entry['hash'].lower() or
-                        search_text in history_entry['timestamp'].lower()):
-                    item.setHidden(False)
-                else:
-                    item.setHidden(True)
+        """Filter history in the model, which searches the store's indexes"""
+        self.history_model.set_search(search_text)
 
     def clear_history(self):
         """Clear all history"""
@@ -1107,8 +1739,8 @@ class APIHasherDesktop(QMainWindow):
         )
 
         if reply == QMessageBox.StandardButton.Yes:
-            self.history.clear()
-            self.history_list.clear()
+            self.history_store.clear()
+            self.history_model.reload()
             self.update_status("History cleared")
 
     def update_hash_format(self, format_type):
@@ -1151,6 +1783,7 @@ class APIHasherDesktop(QMainWindow):
 
 def main():
     app = QApplication(sys.argv)
+    app.setApplicationName("API-Hasher")
     app.setStyle('Fusion')
 
     # Set application font
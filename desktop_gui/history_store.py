@@ -0,0 +1,234 @@
+import sqlite3
+import time
+
+# Characters of the input kept as the searchable preview shown in the history list.
+PREVIEW_LENGTH = 50
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    preview TEXT NOT NULL,
+    text_length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_timestamp ON entries (timestamp);
+CREATE INDEX IF NOT EXISTS entries_hash ON entries (hash);
+CREATE TABLE IF NOT EXISTS texts (
+    entry_id INTEGER PRIMARY KEY REFERENCES entries (id) ON DELETE CASCADE,
+    text TEXT NOT NULL
+);
+"""
+
+# Trigram index over the searchable fields, kept in sync with 'entries' by triggers.
+# Trigrams let the index answer substring searches of 3 or more characters.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    preview, hash, timestamp, content='entries', content_rowid='id', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS entries_fts_insert AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts (rowid, preview, hash, timestamp) VALUES (new.id, new.preview, new.hash, new.timestamp);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_fts_delete AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts (entries_fts, rowid, preview, hash, timestamp)
+        VALUES ('delete', old.id, old.preview, old.hash, old.timestamp);
+END;
+"""
+
+# Databases written before FTS_VERSION (PRAGMA user_version) get their index rebuilt.
+FTS_VERSION = 2
+DROP_FTS = """
+DROP TRIGGER IF EXISTS entries_fts_insert;
+DROP TRIGGER IF EXISTS entries_fts_delete;
+DROP TABLE IF EXISTS entries_fts;
+"""
+
+# Searches shorter than a trigram are answered by scanning entries newest first.
+MIN_FTS_SEARCH_LENGTH = 3
+
+ENTRY_COLUMNS = "id, timestamp, hash, algorithm, preview, text_length"
+
+
+def make_preview(text):
+    """
+    Builds the one-line preview of a history entry.
+
+    Args:
+        text (str): The hashed text.
+
+    Returns:
+        str: The first PREVIEW_LENGTH characters with newlines flattened, plus
+             '...' if the text is longer.
+    """
+    preview = text[:PREVIEW_LENGTH] + "..." if len(text) > PREVIEW_LENGTH else text
+    return preview.replace('\n', ' ')
+
+
+def fts_query(search_text):
+    """Turns a search into an FTS5 trigram phrase query, which matches it as a substring."""
+    return '"{}"'.format(search_text.replace('"', '""'))
+
+
+class HistoryStore:
+    """
+    On-disk hash history in SQLite.
+
+    The list shows a few hundred entries at a time, so only those are ever
+    read: 'entries' holds the small per-entry fields (timestamp, hash,
+    preview) with indexes for ordering and hash lookups, and the full texts
+    live in a separate 'texts' table that is read only when an entry is
+    opened. Searches match substrings of the preview, hash and timestamp,
+    through an FTS5 trigram index when SQLite has one (falling back to LIKE).
+    Retention limits cap the number and age of
+    entries, so the database does not grow without bound.
+    """
+
+    def __init__(self, path, max_entries=None, max_age_days=None):
+        """
+        Args:
+            path (str): The database file (created if missing), or ':memory:'.
+            max_entries (int): Keep at most this many entries (None means no limit).
+            max_age_days (float): Delete entries older than this (None means no limit).
+        """
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self._connection = sqlite3.connect(path)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.execute("PRAGMA journal_mode = WAL") # Appends do not rewrite the main file
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        with self._connection:
+            self._connection.executescript(SCHEMA)
+            rebuild = self._connection.execute("PRAGMA user_version").fetchone()[0] < FTS_VERSION
+            if rebuild:
+                self._connection.executescript(DROP_FTS)
+            try:
+                self._connection.executescript(FTS_SCHEMA)
+                self.has_fts = True
+            except sqlite3.OperationalError: # SQLite built without FTS5 or its trigram tokenizer
+                self.has_fts = False
+            if rebuild:
+                if self.has_fts:
+                    self._connection.execute("INSERT INTO entries_fts (entries_fts) VALUES ('rebuild')")
+                    self._connection.execute(f"PRAGMA user_version = {FTS_VERSION}")
+        self.apply_retention()
+
+    def close(self):
+        self._connection.close()
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def add(self, text, hash_value, algorithm='sha256', timestamp=None):
+        """
+        Stores a history entry and its full text.
+
+        Args:
+            text (str): The hashed text.
+            hash_value (str): The hexadecimal hash.
+            algorithm (str): The algorithm name.
+            timestamp (str): 'yyyy-MM-dd hh:mm:ss' local time (defaults to now).
+
+        Returns:
+            dict: The stored entry, without its text (see get_text()).
+        """
+        if timestamp is None:
+            timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+        entry = {'timestamp': timestamp, 'hash': hash_value.lower(), 'algorithm': algorithm,
+                 'preview': make_preview(text), 'text_length': len(text)}
+        with self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO entries (timestamp, hash, algorithm, preview, text_length) "
+                "VALUES (:timestamp, :hash, :algorithm, :preview, :text_length)", entry)
+            entry['id'] = cursor.lastrowid
+            self._connection.execute("INSERT INTO texts (entry_id, text) VALUES (?, ?)", (entry['id'], text))
+            if self.max_entries is not None:
+                # IDs grow by one per entry and only the oldest entries are ever deleted.
+                self._connection.execute(
+                    "DELETE FROM entries WHERE id <= ?", (entry['id'] - self.max_entries,))
+        return entry
+
+    def get_text(self, entry_id):
+        """
+        Loads the full text of an entry.
+
+        Returns:
+            str: The text, or None if the entry no longer exists.
+        """
+        row = self._connection.execute("SELECT text FROM texts WHERE entry_id = ?", (entry_id,)).fetchone()
+        return row[0] if row is not None else None
+
+    def recent(self, limit, before_id=None):
+        """
+        Lists entries newest first.
+
+        Args:
+            limit (int): The most entries to return.
+            before_id (int): Only return entries older than this entry, for paging.
+
+        Returns:
+            list: Entry dicts with 'id', 'timestamp', 'hash', 'algorithm', 'preview' and 'text_length'.
+        """
+        older = "WHERE id < ?" if before_id is not None else ""
+        parameters = (before_id, limit) if before_id is not None else (limit,)
+        rows = self._connection.execute(
+            f"SELECT {ENTRY_COLUMNS} FROM entries {older} ORDER BY id DESC LIMIT ?", parameters)
+        return [dict(row) for row in rows]
+
+    def search(self, search_text, limit, before_id=None):
+        """
+        Lists entries matching a search, newest first.
+
+        An entry matches if the search is a case-insensitive substring of its
+        preview, hash or timestamp.
+
+        Args:
+            search_text (str): The search as typed.
+            limit (int): The most entries to return.
+            before_id (int): Only return entries older than this entry, for paging.
+
+        Returns:
+            list: Entry dicts, as returned by recent().
+        """
+        if not search_text:
+            return self.recent(limit, before_id)
+
+        if self.has_fts and len(search_text) >= MIN_FTS_SEARCH_LENGTH:
+            older = "AND rowid < :before_id" if before_id is not None else ""
+            matches = (f"SELECT rowid FROM entries_fts WHERE entries_fts MATCH :search {older} "
+                       f"ORDER BY rowid DESC LIMIT :limit")
+            parameters = {'search': fts_query(search_text), 'limit': limit, 'before_id': before_id}
+        else:
+            # Walks the entries newest first and stops after 'limit' matches; short
+            # searches usually match often, so few rows are read.
+            older = "AND id < :before_id" if before_id is not None else ""
+            matches = (f"SELECT id FROM entries WHERE (preview LIKE :search ESCAPE '\\' OR hash LIKE :search "
+                       f"ESCAPE '\\' OR timestamp LIKE :search ESCAPE '\\') {older} ORDER BY id DESC LIMIT :limit")
+            escaped = search_text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            parameters = {'search': f'%{escaped}%', 'limit': limit, 'before_id': before_id}
+        rows = self._connection.execute(
+            f"SELECT {ENTRY_COLUMNS} FROM entries WHERE id IN ({matches}) ORDER BY id DESC", parameters)
+        return [dict(row) for row in rows]
+
+    def apply_retention(self):
+        """
+        Deletes entries beyond max_entries or older than max_age_days.
+
+        Returns:
+            int: The number of entries deleted.
+        """
+        deleted = 0
+        with self._connection:
+            if self.max_age_days is not None:
+                cutoff = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(time.time() - self.max_age_days * 86400))
+                deleted += self._connection.execute("DELETE FROM entries WHERE timestamp < ?", (cutoff,)).rowcount
+            if self.max_entries is not None:
+                deleted += self._connection.execute(
+                    "DELETE FROM entries WHERE id <= (SELECT id FROM entries ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                    (self.max_entries,)).rowcount
+        return deleted
+
+    def clear(self):
+        """Deletes every entry."""
+        with self._connection:
+            self._connection.execute("DELETE FROM entries")
@@ -0,0 +1,143 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Rough per-entry bookkeeping cost (OrderedDict node, key tuple, value tuple) in bytes.
+ENTRY_OVERHEAD_BYTES = 200
+
+
+class DigestCache:
+    """
+    Bounded in-process LRU cache of digests keyed by (algorithm, input).
+
+    The cache is limited by the approximate memory its entries use rather than
+    by entry count, so a few large inputs cannot blow the budget. Entries can
+    expire after a TTL, and inputs larger than max_entry_bytes are never stored
+    so that one huge payload cannot evict the whole working set.
+    """
+
+    def __init__(self, max_bytes, ttl=None, max_entry_bytes=None, clock=time.monotonic):
+        """
+        Args:
+            max_bytes (int): Upper bound on the approximate size of all entries.
+            ttl (float): Seconds an entry stays valid, or None to never expire.
+            max_entry_bytes (int): Inputs whose in-memory size exceeds this are
+                                   not cached (None means no per-entry limit).
+            clock (callable): Returns the current time in seconds.
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_entry_bytes = max_entry_bytes
+        self._clock = clock
+        self._entries = OrderedDict() # (algorithm, input) -> (hexdigest, expires_at, size)
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.bypasses = 0
+
+    def is_cacheable(self, input_string):
+        """Returns True if the input is small enough to be cached."""
+        return self.max_entry_bytes is None or sys.getsizeof(input_string) <= self.max_entry_bytes
+
+    def get(self, algorithm, input_string):
+        """
+        Looks up the digest of an input.
+
+        Args:
+            algorithm (str): The algorithm name.
+            input_string (str): The hashed input.
+
+        Returns:
+            str: The cached hexadecimal digest, or None on a miss.
+        """
+        if not self.is_cacheable(input_string):
+            with self._lock:
+                self.bypasses += 1
+            return None
+
+        key = (algorithm, input_string)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            hexdigest, expires_at, size = entry
+            if expires_at is not None and expires_at <= self._clock():
+                del self._entries[key]
+                self._size_bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key) # Mark as most recently used
+            self.hits += 1
+            return hexdigest
+
+    def put(self, algorithm, input_string, hexdigest):
+        """
+        Stores the digest of an input, evicting least recently used entries as needed.
+
+        Inputs that are too large for the cache are silently ignored.
+
+        Args:
+            algorithm (str): The algorithm name.
+            input_string (str): The hashed input.
+            hexdigest (str): The digest to remember.
+        """
+        if not self.is_cacheable(input_string):
+            return
+
+        size = sys.getsizeof(input_string) + sys.getsizeof(hexdigest) + ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return
+
+        expires_at = self._clock() + self.ttl if self.ttl is not None else None
+        key = (algorithm, input_string)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size_bytes -= previous[2]
+
+            self._entries[key] = (hexdigest, expires_at, size)
+            self._size_bytes += size
+
+            while self._size_bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._size_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """Removes every entry. Counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+
+    def stats(self):
+        """
+        Returns the cache counters and current occupancy.
+
+        Returns:
+            dict: Contains 'hits', 'misses', 'hit_ratio', 'evictions', 'expirations',
+                  'bypasses', 'entries', 'size_bytes', 'max_bytes', 'max_entry_bytes'
+                  and 'ttl_seconds'.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "bypasses": self.bypasses,
+                "entries": len(self._entries),
+                "size_bytes": self._size_bytes,
+                "max_bytes": self.max_bytes,
+                "max_entry_bytes": self.max_entry_bytes,
+                "ttl_seconds": self.ttl
+            }
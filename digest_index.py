@@ -0,0 +1,206 @@
+"""
+Known-digest index: fast membership checks against a large set of digests.
+
+The index file is a plain sorted array of raw fixed-size digests (32 bytes
+for SHA-256) with no header, so it can also be produced by other tools. It is
+memory-mapped, so loading it is instant regardless of size and the operating
+system pages in only the parts that lookups touch. A lookup is a binary search
+over the mapped array.
+
+An optional Bloom filter file sits in front of the array: most digests that
+are not in the set are rejected after reading a few bits instead of the
+~log2(n) scattered pages a binary search touches. Since digests are already
+uniformly distributed, the filter derives its bit positions from the digest
+bytes instead of hashing again.
+
+Build an index from text files of hex digests (one per line; extra columns
+such as sha256sum's file names are ignored):
+
+    python digest_index.py known.idx hashes.txt more-hashes.txt --bloom known.bloom
+"""
+import argparse
+import bisect
+import mmap
+import os
+import struct
+import sys
+
+BLOOM_MAGIC = b'DBF1'
+BLOOM_HEADER = struct.Struct('<4sIQ') # magic, number of bit positions per digest, number of bits
+
+
+def _bloom_positions(digest, hash_count, bit_count):
+    """Derives the Bloom filter bit positions of a digest (Kirsch-Mitzenmacher double hashing)."""
+    first = int.from_bytes(digest[:8], 'little')
+    second = int.from_bytes(digest[8:16], 'little') | 1
+    return [(first + index * second) % bit_count for index in range(hash_count)]
+
+
+class _DigestArray:
+    """Sequence view of the mapped digests, so the bisect module can search it."""
+
+    def __init__(self, mapped, digest_size):
+        self._mapped = mapped
+        self._digest_size = digest_size
+        self._count = len(mapped) // digest_size
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        start = index * self._digest_size
+        return self._mapped[start:start + self._digest_size]
+
+
+class DigestIndex:
+    """A memory-mapped sorted digest array with an optional Bloom filter in front."""
+
+    def __init__(self, path, digest_size=32, bloom_path=None):
+        """
+        Args:
+            path (str): The sorted digest array file.
+            digest_size (int): The size of each digest in bytes.
+            bloom_path (str): An optional Bloom filter file built for the same digests.
+
+        Raises:
+            OSError: If a file cannot be opened.
+            ValueError: If a file is malformed.
+        """
+        self.path = path
+        self.digest_size = digest_size
+        self._mapped = self._map(path)
+        if len(self._mapped) % digest_size:
+            raise ValueError(f"{path} is not a whole number of {digest_size}-byte digests")
+        self._digests = _DigestArray(self._mapped, digest_size)
+
+        self._bloom = None
+        self._bloom_hash_count = self._bloom_bit_count = 0
+        if bloom_path is not None:
+            self._bloom = self._map(bloom_path)
+            if len(self._bloom) < BLOOM_HEADER.size:
+                raise ValueError(f"{bloom_path} is too short for a digest Bloom filter header")
+            magic, self._bloom_hash_count, self._bloom_bit_count = BLOOM_HEADER.unpack_from(self._bloom)
+            if magic != BLOOM_MAGIC:
+                raise ValueError(f"{bloom_path} is not a digest Bloom filter")
+            if self._bloom_hash_count == 0 or self._bloom_bit_count == 0:
+                raise ValueError(f"{bloom_path} has no bit positions or no bits")
+            if len(self._bloom) < BLOOM_HEADER.size + (self._bloom_bit_count + 7) // 8:
+                raise ValueError(f"{bloom_path} is truncated")
+
+    @staticmethod
+    def _map(path):
+        with open(path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return b'' # Empty files cannot be mapped
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return len(self._digests)
+
+    def _bloom_may_contain(self, digest):
+        for position in _bloom_positions(digest, self._bloom_hash_count, self._bloom_bit_count):
+            if not self._bloom[BLOOM_HEADER.size + position // 8] & (1 << (position % 8)):
+                return False
+        return True
+
+    def __contains__(self, digest):
+        """
+        Checks whether a raw digest is in the index.
+
+        Args:
+            digest (bytes): A raw digest of digest_size bytes.
+
+        Returns:
+            bool: True if the digest is in the index.
+        """
+        if len(digest) != self.digest_size:
+            return False
+        if self._bloom is not None and not self._bloom_may_contain(digest):
+            return False
+        index = bisect.bisect_left(self._digests, digest)
+        return index < len(self._digests) and self._digests[index] == digest
+
+
+def read_hex_digests(paths, digest_size):
+    """
+    Reads hex digests from text files, one per line (the first column is used).
+
+    Args:
+        paths (list): Text file paths.
+        digest_size (int): The expected digest size in bytes.
+
+    Yields:
+        bytes: Each raw digest.
+
+    Raises:
+        ValueError: If a line does not start with a digest of the expected size.
+    """
+    for path in paths:
+        with open(path, encoding='ascii') as file:
+            for line_number, line in enumerate(file, 1):
+                fields = line.split()
+                if not fields:
+                    continue
+                digest = bytes.fromhex(fields[0]) if len(fields[0]) == digest_size * 2 else b''
+                if len(digest) != digest_size:
+                    raise ValueError(f"{path}:{line_number}: expected a {digest_size * 2}-character hex digest")
+                yield digest
+
+
+def build_digest_index(digests, path, bloom_path=None, bloom_bits_per_digest=10, bloom_hash_count=7):
+    """
+    Writes a sorted, de-duplicated digest array and optionally its Bloom filter.
+
+    The digests are sorted in memory, so building needs roughly twice the
+    size of the index in RAM.
+
+    Args:
+        digests (iterable): Raw digests of equal size.
+        path (str): Where to write the digest array.
+        bloom_path (str): Where to write the Bloom filter, or None for no filter.
+        bloom_bits_per_digest (int): Filter size; 10 bits with 7 positions gives
+                                     about a 1% false positive rate.
+        bloom_hash_count (int): Bit positions set per digest.
+
+    Returns:
+        int: The number of distinct digests written.
+    """
+    unique_digests = sorted(set(digests))
+    with open(path, 'wb') as file:
+        for digest in unique_digests:
+            file.write(digest)
+
+    if bloom_path is not None:
+        bit_count = max(len(unique_digests) * bloom_bits_per_digest, 64)
+        bit_count += -bit_count % 8
+        bits = bytearray(bit_count // 8)
+        for digest in unique_digests:
+            for position in _bloom_positions(digest, bloom_hash_count, bit_count):
+                bits[position // 8] |= 1 << (position % 8)
+        with open(bloom_path, 'wb') as file:
+            file.write(BLOOM_HEADER.pack(BLOOM_MAGIC, bloom_hash_count, bit_count))
+            file.write(bits)
+    return len(unique_digests)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a known-digest index from files of hex digests.")
+    parser.add_argument('output', help="The index file to write.")
+    parser.add_argument('inputs', nargs='+', help="Text files with one hex digest per line.")
+    parser.add_argument('--bloom', default=None, help="Also write a Bloom filter to this file.")
+    parser.add_argument('--digest-size', type=int, default=32, help="Digest size in bytes (default: 32).")
+    parser.add_argument('--bloom-bits', type=int, default=10, help="Bloom filter bits per digest (default: 10).")
+    args = parser.parse_args(argv)
+
+    try:
+        count = build_digest_index(read_hex_digests(args.inputs, args.digest_size), args.output,
+                                   args.bloom, args.bloom_bits)
+    except (OSError, ValueError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+    print(f"Wrote {count} digests to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
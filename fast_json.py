@@ -0,0 +1,84 @@
+"""
+Fast JSON provider for the API-Hasher Flask app.
+
+For small inputs, parsing the request and serializing the response cost more
+than hashing the text. FastJSONProvider replaces Flask's default provider and
+uses orjson when it is installed (pip install orjson), falling back to the
+standard library json module otherwise.
+
+Differences from Flask's DefaultJSONProvider:
+
+* Output is always compact, even in debug mode, and keys keep the order the
+  routes build them in instead of being sorted.
+* Non-ASCII characters are written as UTF-8 rather than as \\uXXXX escapes.
+  Both are valid JSON and decode to the same values.
+* Responses are built from the encoded bytes directly, without an
+  intermediate str.
+
+Values orjson does not support (integers beyond 64 bits, NaN and Infinity in
+requests, non-string dict keys) are handed to the standard library, so the set
+of accepted requests and the error messages do not change.
+"""
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes and decodes with orjson when available."""
+
+    # Never pretty-print, keep keys in insertion order, and write UTF-8 as is.
+    compact = True
+    sort_keys = False
+    ensure_ascii = False
+
+    @property
+    def backend(self):
+        """The name of the JSON library in use, 'orjson' or 'json'."""
+        return 'orjson' if orjson is not None else 'json'
+
+    def dumps_bytes(self, obj):
+        """
+        Serializes obj to UTF-8 encoded JSON.
+
+        Args:
+            obj: The value to serialize.
+
+        Returns:
+            bytes: The compact JSON document.
+        """
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj, default=self.default)
+            except TypeError:
+                pass # orjson.JSONEncodeError: fall back to the standard library below
+        return self.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            try:
+                return orjson.dumps(obj, default=self.default).decode('utf-8')
+            except TypeError:
+                pass
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        kwargs.setdefault('separators', (',', ':'))
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            try:
+                return orjson.loads(s)
+            except ValueError:
+                pass # Let the standard library accept what orjson rejects, or raise its usual error
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
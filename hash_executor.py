@@ -0,0 +1,140 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+EXECUTOR_KINDS = ('thread', 'process')
+
+
+def _apply_to_batch(func, batch):
+    """Applies func to every item of a batch inside a worker."""
+    return [func(item) for item in batch]
+
+
+def split_into_batches(items, sizes, batch_count):
+    """
+    Splits items into contiguous batches of roughly equal total size.
+
+    Args:
+        items (list): The items to split, in order.
+        sizes (list): The size of each item (e.g. its length).
+        batch_count (int): The desired number of batches.
+
+    Returns:
+        list: Lists of items whose concatenation is the original list.
+    """
+    target = max(sum(sizes) / max(batch_count, 1), 1)
+    batches = []
+    current = []
+    current_size = 0
+    for item, size in zip(items, sizes):
+        current.append(item)
+        current_size += size
+        if current_size >= target:
+            batches.append(current)
+            current = []
+            current_size = 0
+    if current:
+        batches.append(current)
+    return batches
+
+
+class HashExecutor:
+    """
+    Spreads CPU-heavy hashing work across cores.
+
+    Small workloads are hashed inline because handing them to a pool costs more
+    than it saves. Large workloads go to a concurrent.futures pool:
+
+    * Batches of many inputs are split into contiguous slices and sent to the
+      configured pool. A 'process' pool sidesteps the GIL even for small items;
+      a 'thread' pool avoids pickling and works best for larger items.
+    * Large in-memory buffers are always sent to a thread pool, since hashlib
+      releases the GIL while hashing big buffers and threads can share the
+      buffer without copying it.
+
+    Pools are created on first use.
+    """
+
+    def __init__(self, kind='thread', max_workers=None, inline_threshold=1024 * 1024):
+        """
+        Args:
+            kind (str): 'thread' or 'process' pool for batches, or None to always hash inline.
+            max_workers (int): Workers per pool (defaults to the number of CPUs).
+            inline_threshold (int): Workloads smaller than this many bytes are hashed inline.
+        """
+        if kind is not None and kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor kind: {kind!r}")
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.inline_threshold = inline_threshold
+        self._batch_pool = None
+        self._buffer_pool = None
+        self._lock = threading.Lock()
+
+    def should_offload(self, size):
+        """Returns True if a workload of the given size is worth sending to a pool."""
+        return self.kind is not None and self.max_workers > 1 and size >= self.inline_threshold
+
+    def _get_batch_pool(self):
+        with self._lock:
+            if self._batch_pool is None:
+                pool_class = ProcessPoolExecutor if self.kind == 'process' else ThreadPoolExecutor
+                self._batch_pool = pool_class(max_workers=self.max_workers)
+            return self._batch_pool
+
+    def _get_buffer_pool(self):
+        with self._lock:
+            if self._buffer_pool is None:
+                self._buffer_pool = ThreadPoolExecutor(max_workers=self.max_workers)
+            return self._buffer_pool
+
+    def map_items(self, func, items, sizes):
+        """
+        Applies func to every item, in parallel when the total size is large enough.
+
+        With a 'process' pool, func and the items must be picklable (func must
+        be a module-level function).
+
+        Args:
+            func (callable): Called with one item, returns its result.
+            items (list): The inputs.
+            sizes (list): The size in bytes of each item, used for the inline
+                          threshold and to balance the slices.
+
+        Returns:
+            list: The results in input order.
+        """
+        if len(items) < 2 or not self.should_offload(sum(sizes)):
+            return [func(item) for item in items]
+
+        # A few slices per worker keeps the pool busy when item sizes are uneven.
+        batches = split_into_batches(items, sizes, self.max_workers * 4)
+        pool = self._get_batch_pool()
+        results = []
+        for batch_results in pool.map(_apply_to_batch, [func] * len(batches), batches):
+            results.extend(batch_results)
+        return results
+
+    def map_buffer(self, funcs, buffer):
+        """
+        Runs several functions over the same in-memory buffer, in parallel when it is large.
+
+        Args:
+            funcs (list): Callables that each take the buffer.
+            buffer: A bytes-like object shared (not copied) between threads.
+
+        Returns:
+            list: The results in the order of funcs.
+        """
+        if len(funcs) < 2 or not self.should_offload(len(buffer)):
+            return [func(buffer) for func in funcs]
+        return list(self._get_buffer_pool().map(lambda func: func(buffer), funcs))
+
+    def shutdown(self):
+        """Shuts down any pools that were started."""
+        with self._lock:
+            for pool in (self._batch_pool, self._buffer_pool):
+                if pool is not None:
+                    pool.shutdown()
+            self._batch_pool = None
+            self._buffer_pool = None
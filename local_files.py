@@ -0,0 +1,152 @@
+import mmap
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def is_within_roots(path, roots):
+    """
+    Checks whether a path lies inside one of the allowed directories.
+
+    Both the path and the roots are resolved with os.path.realpath first, so
+    '..' components and symbolic links cannot escape the allowlist.
+
+    Args:
+        path (str): The path to check.
+        roots (list): Allowed directory paths.
+
+    Returns:
+        str: The resolved path if it is inside a root, otherwise None.
+    """
+    resolved = os.path.realpath(path)
+    for root in roots:
+        resolved_root = os.path.realpath(root)
+        if os.path.commonpath([resolved, resolved_root]) == resolved_root:
+            return resolved
+    return None
+
+
+def hash_file(path, algorithms, new_hasher, chunk_size):
+    """
+    Hashes a file through a read-only memory map.
+
+    The mapped pages are fed to every hasher as memoryview slices, so the file
+    contents are never copied into Python bytes objects.
+
+    Args:
+        path (str): The file to hash.
+        algorithms (list): Algorithm names understood by new_hasher.
+        new_hasher (callable): Returns a fresh hasher object for an algorithm name.
+        chunk_size (int): Bytes fed to every hasher per step.
+
+    Returns:
+        tuple: (hexdigests, byte_count) where hexdigests maps each algorithm
+               name to the hexadecimal hash.
+
+    Raises:
+        OSError: If the file cannot be opened or mapped.
+    """
+    hashers = {algorithm: new_hasher(algorithm) for algorithm in algorithms}
+    with open(path, 'rb') as file:
+        byte_count = os.fstat(file.fileno()).st_size
+        if byte_count: # Empty files cannot be mapped
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                for offset in range(0, byte_count, chunk_size):
+                    with view[offset:offset + chunk_size] as chunk: # Slices must be released before the map closes
+                        for hasher in hashers.values():
+                            hasher.update(chunk)
+    return {algorithm: hasher.hexdigest() for algorithm, hasher in hashers.items()}, byte_count
+
+
+def hash_manifest_entry(entry, algorithms, new_hasher, chunk_size):
+    """
+    Hashes one file found by walk_tree(), reporting I/O errors instead of raising them.
+
+    Args:
+        entry (tuple): (relative_path, absolute_path, size) from walk_tree().
+        algorithms (list): Algorithm names understood by new_hasher.
+        new_hasher (callable): Returns a fresh hasher object for an algorithm name.
+        chunk_size (int): Bytes fed to every hasher per step.
+
+    Returns:
+        tuple: (hexdigests, byte_count, error) where error is a message
+               (and the other values None) if the file could not be read.
+    """
+    try:
+        hexdigests, byte_count = hash_file(entry[1], algorithms, new_hasher, chunk_size)
+    except OSError as error:
+        return None, None, f"Could not read file: {error.strerror or error}"
+    return hexdigests, byte_count, None
+
+
+def _scan_directory(path, relative_path):
+    """Lists the regular files and subdirectories of one directory, without following symbolic links."""
+    files = []
+    directories = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            entry_relative_path = f"{relative_path}/{entry.name}" if relative_path else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                directories.append((entry.path, entry_relative_path))
+            elif entry.is_file(follow_symlinks=False):
+                files.append((entry_relative_path, entry.path, entry.stat(follow_symlinks=False).st_size))
+    return files, directories
+
+
+def walk_tree(root, max_workers=None, max_files=None):
+    """
+    Lists every regular file below a directory, scanning subdirectories concurrently.
+
+    Symbolic links and special files (sockets, FIFOs, devices) are skipped, so
+    the walk cannot leave the tree or block on a pipe. Directories that cannot
+    be read are skipped as well.
+
+    Args:
+        root (str): The directory to walk.
+        max_workers (int): Threads scanning directories (defaults to the number of CPUs).
+        max_files (int): Stop and return None once more files than this are found.
+
+    Returns:
+        list: (relative_path, absolute_path, size) tuples sorted by relative
+              path, with '/' separators, or None if max_files was exceeded.
+    """
+    found = []
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1) as pool:
+        pending = {pool.submit(_scan_directory, root, '')}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    files, directories = future.result()
+                except OSError:
+                    continue
+                found.extend(files)
+                if max_files is not None and len(found) > max_files:
+                    for other in pending:
+                        other.cancel()
+                    return None
+                pending.update(pool.submit(_scan_directory, path, relative_path) for path, relative_path in directories)
+    found.sort()
+    return found
+
+
+def tree_digest(manifest, algorithm, new_hasher):
+    """
+    Combines a directory manifest into a single digest.
+
+    The digest is taken over one '<hexdigest>  <relative path>' line per file,
+    in sorted path order, which is the output format of sha256sum and similar
+    tools. Two trees have the same digest exactly when they contain the same
+    paths with the same contents.
+
+    Args:
+        manifest (list): (relative_path, hexdigests) pairs sorted by path.
+        algorithm (str): The algorithm used for the files and the combined digest.
+        new_hasher (callable): Returns a fresh hasher object for an algorithm name.
+
+    Returns:
+        str: The hexadecimal tree digest.
+    """
+    hasher = new_hasher(algorithm)
+    for relative_path, hexdigests in manifest:
+        hasher.update(f"{hexdigests[algorithm]}  {relative_path}\n".encode('utf-8', 'surrogateescape'))
+    return hasher.hexdigest()
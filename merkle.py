@@ -0,0 +1,75 @@
+# Domain separation prefixes, as in RFC 6962 (Certificate Transparency): a leaf
+# digest can never be confused with an interior node digest.
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+
+
+def leaf_digest(buffer, start, end, algorithm, new_hasher):
+    """
+    Hashes one leaf chunk of a buffer.
+
+    Args:
+        buffer: A bytes-like object; sliced through a memoryview, so not copied.
+        start (int): Offset of the first byte of the leaf.
+        end (int): Offset just past the last byte of the leaf.
+        algorithm (str): The algorithm name understood by new_hasher.
+        new_hasher (callable): Returns a fresh hasher object for an algorithm name.
+
+    Returns:
+        bytes: H(0x00 || buffer[start:end]).
+    """
+    hasher = new_hasher(algorithm)
+    hasher.update(LEAF_PREFIX)
+    with memoryview(buffer) as view, view[start:end] as leaf:
+        hasher.update(leaf)
+    return hasher.digest()
+
+
+def merkle_root(leaf_digests, algorithm, new_hasher):
+    """
+    Combines leaf digests into the root of a binary Merkle tree.
+
+    Each level pairs neighbouring digests as H(0x01 || left || right). An
+    odd digest at the end of a level is carried up unchanged. A single leaf
+    is its own root.
+
+    Args:
+        leaf_digests (list): The leaf digests (bytes) in input order; at least one.
+        algorithm (str): The algorithm name understood by new_hasher.
+        new_hasher (callable): Returns a fresh hasher object for an algorithm name.
+
+    Returns:
+        bytes: The root digest.
+    """
+    level = list(leaf_digests)
+    while len(level) > 1:
+        next_level = []
+        for index in range(0, len(level) - 1, 2):
+            hasher = new_hasher(algorithm)
+            hasher.update(NODE_PREFIX)
+            hasher.update(level[index])
+            hasher.update(level[index + 1])
+            next_level.append(hasher.digest())
+        if len(level) % 2:
+            next_level.append(level[-1])
+        level = next_level
+    return level[0]
+
+
+def leaf_ranges(byte_count, leaf_size):
+    """
+    Splits byte_count bytes into consecutive leaves of leaf_size bytes.
+
+    The last leaf may be shorter. Empty input has one empty leaf, so every
+    input has a root.
+
+    Args:
+        byte_count (int): The input length in bytes.
+        leaf_size (int): The number of bytes per leaf.
+
+    Returns:
+        list: (start, end) offsets of each leaf.
+    """
+    if byte_count == 0:
+        return [(0, 0)]
+    return [(start, min(start + leaf_size, byte_count)) for start in range(0, byte_count, leaf_size)]
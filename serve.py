@@ -0,0 +1,170 @@
+"""
+Production entry point for the API-Hasher web application and API.
+
+Runs app.py behind a multi-worker server instead of Flask's single-process
+development server:
+
+* gunicorn  - pre-forked worker processes, optionally with threads (Linux/macOS).
+* waitress  - a pure-Python multi-threaded server that also runs on Windows.
+* werkzeug  - Flask's development server, for local debugging only.
+* uvicorn   - serves the asyncio variant of the API in asgi_app.py instead,
+              for many mostly idle keep-alive clients.
+
+Example:
+    python serve.py --server gunicorn --workers 4 --threads 2 --port 8000
+"""
+import argparse
+import os
+import sys
+
+from app import app
+
+SERVERS = ('auto', 'gunicorn', 'waitress', 'werkzeug', 'uvicorn')
+
+
+def default_workers():
+    """Returns gunicorn's recommended worker count of (2 x CPUs) + 1."""
+    return (os.cpu_count() or 1) * 2 + 1
+
+
+def resolve_server(name):
+    """
+    Picks the server to use.
+
+    Args:
+        name (str): One of SERVERS. 'auto' prefers gunicorn, then waitress,
+                    and falls back to the werkzeug development server.
+
+    Returns:
+        str: The name of an importable server.
+    """
+    if name != 'auto':
+        return name
+    for candidate in ('gunicorn', 'waitress'):
+        if candidate == 'gunicorn' and sys.platform == 'win32':
+            continue # gunicorn relies on fork() and does not run on Windows
+        try:
+            __import__(candidate)
+        except ImportError:
+            continue
+        return candidate
+    return 'werkzeug'
+
+
+def serve_gunicorn(args):
+    """Runs the app with gunicorn's pre-fork worker model."""
+    from gunicorn.app.base import BaseApplication
+
+    class HasherApplication(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    # Send SIGHUP to the master process for a graceful reload: new workers
+    # are started before the old ones finish their in-flight requests.
+    HasherApplication({
+        'bind': f"{args.host}:{args.port}",
+        'workers': args.workers or default_workers(),
+        'threads': args.threads,
+        'worker_class': 'gthread' if args.threads > 1 else 'sync',
+        'keepalive': args.keep_alive,
+        'backlog': args.backlog,
+        'timeout': args.timeout,
+        'graceful_timeout': args.graceful_timeout,
+        'reload': args.reload,
+    }).run()
+
+
+def serve_waitress(args):
+    """Runs the app with waitress' multi-threaded server."""
+    import waitress
+
+    if args.workers and args.workers > 1:
+        print("waitress runs a single process; use --threads to scale it.", file=sys.stderr)
+    waitress.serve(
+        app,
+        host=args.host,
+        port=args.port,
+        threads=args.threads,
+        backlog=args.backlog,
+        channel_timeout=args.timeout, # Idle keep-alive connections are closed after this
+    )
+
+
+def serve_uvicorn(args):
+    """Runs the ASGI variant of the API (asgi_app.py) with uvicorn."""
+    import uvicorn
+
+    uvicorn.run(
+        'asgi_app:application',
+        host=args.host,
+        port=args.port,
+        workers=args.workers or 1,
+        backlog=args.backlog,
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        reload=args.reload,
+        lifespan='on',
+    )
+
+
+def serve_werkzeug(args):
+    """Runs Flask's development server (single process, one thread per request)."""
+    app.run(host=args.host, port=args.port, debug=args.debug, use_reloader=args.reload, threaded=True)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Serve the API-Hasher web application and API.")
+    parser.add_argument('--server', choices=SERVERS, default='auto',
+                        help="Server implementation (default: gunicorn if available, then waitress).")
+    parser.add_argument('--host', default='127.0.0.1', help="Interface to bind (default: 127.0.0.1).")
+    parser.add_argument('--port', type=int, default=5000, help="Port to bind (default: 5000).")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes for gunicorn (default: 2 x CPUs + 1) or uvicorn (default: 1).")
+    parser.add_argument('--threads', type=int, default=4,
+                        help="Threads per worker process (default: 4).")
+    parser.add_argument('--keep-alive', type=int, default=5,
+                        help="Seconds to keep idle keep-alive connections open (gunicorn and uvicorn, default: 5).")
+    parser.add_argument('--backlog', type=int, default=2048,
+                        help="Maximum number of pending connections (default: 2048).")
+    parser.add_argument('--timeout', type=int, default=30,
+                        help="Seconds before a silent worker or idle connection is dropped (default: 30).")
+    parser.add_argument('--graceful-timeout', type=int, default=30,
+                        help="Seconds workers get to finish in-flight requests on reload or shutdown (gunicorn and uvicorn, default: 30).")
+    parser.add_argument('--reload', action='store_true',
+                        help="Restart workers when the code changes (gunicorn, uvicorn and werkzeug).")
+    parser.add_argument('--debug', action='store_true',
+                        help="Enable Flask's interactive debugger (werkzeug only, never in production).")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    server = resolve_server(args.server)
+
+    if args.debug and server != 'werkzeug':
+        parser.error("--debug is only supported with --server werkzeug")
+    if server == 'werkzeug':
+        print("Warning: using the werkzeug development server; install gunicorn or waitress for production.",
+              file=sys.stderr)
+
+    print(f"Serving API-Hasher with {server} on http://{args.host}:{args.port}", file=sys.stderr)
+    servers = {
+        'gunicorn': serve_gunicorn,
+        'waitress': serve_waitress,
+        'werkzeug': serve_werkzeug,
+        'uvicorn': serve_uvicorn,
+    }
+    servers[server](args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+import hashlib
+import hmac
+import threading
+
+SIGNING_MODES = ('hmac', 'blake2')
+
+# Keyed BLAKE2 variants and their longest allowed key, in bytes.
+BLAKE2_KEY_SIZES = {'blake2b': hashlib.blake2b.MAX_KEY_SIZE, 'blake2s': hashlib.blake2s.MAX_KEY_SIZE}
+
+
+class SigningKeyring:
+    """
+    Server-side signing keys with precomputed hasher states.
+
+    Setting up an HMAC means hashing the padded key into an inner and an outer
+    state, and keyed BLAKE2 likewise hashes a key block first. The keyring does
+    this once per (key, mode, algorithm) and keeps the primed object; every
+    signature starts from a copy() of it, so the per-signature cost is only
+    hashing the message.
+    """
+
+    def __init__(self, keys):
+        """
+        Args:
+            keys (dict): Maps key IDs to secret keys (bytes, or str encoded as UTF-8).
+
+        Raises:
+            ValueError: If a key is empty. An empty HMAC key is trivially guessable,
+                and an empty BLAKE2 key gives the plain unkeyed digest.
+        """
+        self._keys = {key_id: key.encode('utf-8') if isinstance(key, str) else bytes(key)
+                      for key_id, key in keys.items()}
+        for key_id, key in self._keys.items():
+            if not key:
+                raise ValueError(f"Signing key '{key_id}' is empty")
+        self._primed = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, key_id):
+        return key_id in self._keys
+
+    def check(self, key_id, mode, algorithm):
+        """
+        Checks whether a key can sign with the given mode and algorithm.
+
+        Args:
+            key_id (str): A registered key ID.
+            mode (str): One of SIGNING_MODES.
+            algorithm (str): The HMAC digest (e.g. 'sha256') or the BLAKE2 variant.
+
+        Returns:
+            str: An error message, or None if signing is possible.
+        """
+        if mode == 'blake2':
+            if algorithm not in BLAKE2_KEY_SIZES:
+                return "Keyed 'blake2' mode requires algorithm 'blake2b' or 'blake2s'"
+            if len(self._keys[key_id]) > BLAKE2_KEY_SIZES[algorithm]:
+                return f"Key '{key_id}' is longer than the {BLAKE2_KEY_SIZES[algorithm]} bytes {algorithm} accepts"
+        return None
+
+    def _get_primed(self, key_id, mode, algorithm):
+        cache_key = (key_id, mode, algorithm)
+        primed = self._primed.get(cache_key)
+        if primed is None:
+            with self._lock:
+                primed = self._primed.get(cache_key)
+                if primed is None:
+                    key = self._keys[key_id]
+                    if mode == 'blake2':
+                        primed = hashlib.new(algorithm, key=key)
+                    else:
+                        primed = hmac.new(key, digestmod=algorithm)
+                    self._primed[cache_key] = primed
+        return primed
+
+    def sign(self, key_id, mode, algorithm, data):
+        """
+        Signs data with a registered key.
+
+        The caller must have validated the combination with check().
+
+        Args:
+            key_id (str): A registered key ID.
+            mode (str): One of SIGNING_MODES.
+            algorithm (str): The HMAC digest or the BLAKE2 variant.
+            data (bytes): The message.
+
+        Returns:
+            str: The hexadecimal signature.
+        """
+        signer = self._get_primed(key_id, mode, algorithm).copy()
+        signer.update(data)
+        return signer.hexdigest()
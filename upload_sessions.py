@@ -0,0 +1,128 @@
+import secrets
+import threading
+import time
+
+
+class UploadSession:
+    """
+    The running hash state of one resumable upload.
+
+    'hashers' holds live hasher objects that have been fed every byte up to
+    'offset'. Appends must hold 'lock' so that bytes are hashed in order, and
+    the session is only removed from its store while 'lock' is held, so an
+    append that finds it registered cannot lose its bytes.
+    """
+
+    def __init__(self, session_id, algorithms, multiple, hashers, now):
+        self.session_id = session_id
+        self.algorithms = algorithms
+        self.multiple = multiple
+        self.hashers = hashers
+        self.offset = 0
+        self.last_used = now
+        self.lock = threading.Lock()
+
+    def update(self, chunk):
+        """Feeds the next chunk of the upload to every hasher and advances the offset."""
+        for hasher in self.hashers.values():
+            hasher.update(chunk)
+        self.offset += len(chunk)
+
+    def hexdigests(self):
+        """
+        Returns the digests of the bytes received so far.
+
+        The hashers are copied first, so the session can keep receiving data.
+
+        Returns:
+            dict: Maps each algorithm name to the hexadecimal hash.
+        """
+        return {algorithm: hasher.copy().hexdigest() for algorithm, hasher in self.hashers.items()}
+
+
+class UploadSessionStore:
+    """
+    In-process registry of resumable upload sessions.
+
+    Sessions expire after 'ttl' seconds without being used. Hasher objects
+    cannot be serialized, so sessions live in the memory of the process that
+    created them and are lost on restart.
+    """
+
+    def __init__(self, ttl, max_sessions=None, clock=time.monotonic):
+        """
+        Args:
+            ttl (float): Seconds an idle session is kept.
+            max_sessions (int): Upper bound on open sessions (None means no limit).
+            clock (callable): Returns the current time in seconds.
+        """
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._clock = clock
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _remove_expired(self, now):
+        expired = [session_id for session_id, session in self._sessions.items()
+                   if now - session.last_used > self.ttl and not session.lock.locked()]
+        for session_id in expired:
+            del self._sessions[session_id]
+
+    def create(self, algorithms, multiple, hashers):
+        """
+        Opens a new session.
+
+        Args:
+            algorithms (list): The algorithm names, in request order.
+            multiple (bool): Whether the 'algorithms' list form was requested.
+            hashers (dict): Maps each algorithm name to a fresh hasher object.
+
+        Returns:
+            UploadSession: The new session, or None if max_sessions are open.
+        """
+        now = self._clock()
+        with self._lock:
+            self._remove_expired(now)
+            if self.max_sessions is not None and len(self._sessions) >= self.max_sessions:
+                return None
+            session_id = secrets.token_urlsafe(16)
+            session = UploadSession(session_id, algorithms, multiple, hashers, now)
+            self._sessions[session_id] = session
+            return session
+
+    def get(self, session_id):
+        """
+        Looks up a session and marks it as used.
+
+        Returns:
+            UploadSession: The session, or None if it does not exist or has expired.
+        """
+        now = self._clock()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if now - session.last_used > self.ttl and not session.lock.locked():
+                del self._sessions[session_id]
+                return None
+            session.last_used = now
+            return session
+
+    def is_registered(self, session):
+        """Whether a session is still open, i.e. not finalized, removed or expired since it was looked up."""
+        with self._lock:
+            return self._sessions.get(session.session_id) is session
+
+    def remove(self, session_id):
+        """
+        Closes a session.
+
+        Returns:
+            UploadSession: The removed session, or None if it did not exist.
+        """
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)